@@ -7,235 +7,363 @@ Sleep patterns mimic newborn-to-toddler progression over the specified duration.
 """
 
 import argparse
-import random
-from datetime import datetime, timedelta
+import csv
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, fields
 from pathlib import Path
 
+import numpy as np
 
-def generate_sleep_patterns(start_date: datetime, num_days: int, seed: int = 42) -> list[dict]:
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit: run the decorated function as plain Python."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Huckleberry export columns, in file order
+COLUMNS = ['Type', 'Start', 'End', 'Duration', 'Start Conditions', 'Start Location', 'End Conditions', 'Notes']
+
+# Event type codes used by the generator core, and their Type column values
+SLEEP, FEED, MEDS = 0, 1, 2
+EVENT_TYPES = ('sleep', 'feed', 'meds')
+
+# Sleep parameters per age bucket (0-3, 3-6, 6-12, 12+ months), as inclusive (low, high) ranges
+NUM_NAPS = np.array([(4, 6), (3, 4), (2, 3), (1, 2)])
+NIGHT_WAKINGS = np.array([(2, 4), (1, 3), (0, 2), (0, 1)])
+NAP_DURATION = np.array([(30, 120), (45, 150), (60, 180), (60, 150)])
+NIGHT_STRETCH = np.array([(90, 180), (180, 300), (300, 480), (480, 660)])
+
+# Feeds per day for each age bucket; older babies (over 6 months) switch feed types
+NUM_FEEDS = np.array([(8, 12), (6, 8), (5, 7), (4, 6)])
+FEED_TYPES = ('Breast', 'Formula', 'Bottle', 'Solids')
+FEED_AMOUNTS = ('2oz', '3oz', '4oz', '5oz', '6oz', '8oz')
+
+# Medications: daily Vitamin D plus occasional others, with their dosages
+MED_NAMES = ('Vitamin D', 'Tylenol', 'Gas Relief Drops', 'Gripe Water')
+MED_DOSAGES = ('1ml', '5ml', '2.5ml', '2.5ml')
+
+# The kernels below are compiled eagerly for these exact types when the script is
+# imported, and cache=True saves the machine code (.nbi/.nbc files in __pycache__
+# next to this script) so later runs load it instead of recompiling
+_GEN_CORE_SIGNATURE = 'Tuple((i8[:], i8[:], i8[:], i8[:], i8[:]))(i8, i8, i8)'
+
+# Days generated and written at a time, which bounds memory use for long runs
+DAYS_PER_CHUNK = 90
+
+# Most events any one day can produce (naps, night segments, feeds, one dose of each
+# med), so kernel output buffers are allocated once at their final size
+MAX_EVENTS_PER_DAY = int(
+    NUM_NAPS[:, 1].max() + NIGHT_WAKINGS[:, 1].max() + 1 + NUM_FEEDS[:, 1].max() + len(MED_NAMES)
+)
+
+
+@njit('i8(i8)', cache=True)
+def _age_bucket(day_offset):
+    """Index into the per-age tables for a day (0-3, 3-6, 6-12, 12+ months)."""
+    age_months = day_offset / 30  # Approximate age in months
+    if age_months < 3:
+        return 0
+    elif age_months < 6:
+        return 1
+    elif age_months < 12:
+        return 2
+    return 3
+
+
+@njit('i8(i8, i8)', cache=True)
+def _day_seed(seed, day_offset):
+    """Seed for one day's events, so any range of days can be generated on its own."""
+    return (seed * 1000003 + day_offset) % 4294967296
+
+
+@njit(_GEN_CORE_SIGNATURE, parallel=True, cache=True)
+def _gen_core(first_day, num_days, seed):
     """
-    Generate realistic baby sleep patterns that evolve over time.
-    
-    Newborns (0-3 months): Many short naps, frequent night wakings
-    Infants (3-6 months): Consolidating to 3-4 naps, longer night stretches
-    Older infants (6-12 months): 2-3 naps, mostly sleeping through night
-    Toddlers (12+ months): 1-2 naps, consistent night sleep
+    All events as (event type, start, duration, code, amount) arrays, in one pass over days.
+
+    Starts and durations are in minutes, starts counted from day 0 midnight. code is
+    the FEED_TYPES index for feeds and the MED_NAMES index for meds; amount is the
+    FEED_AMOUNTS index for bottle feeds. Unused fields are -1.
+
+    Days run in parallel under Numba. Each day reseeds the generator and writes to its
+    own MAX_EVENTS_PER_DAY slots, so results don't depend on thread scheduling.
     """
-    random.seed(seed)
-    records = []
-    
-    for day_offset in range(num_days):
-        current_date = start_date + timedelta(days=day_offset)
-        age_months = day_offset / 30  # Approximate age in months
-        
-        # Determine sleep pattern based on age
-        if age_months < 3:
-            # Newborn: 4-6 naps, short night stretches
-            num_naps = random.randint(4, 6)
-            night_wakings = random.randint(2, 4)
-            nap_duration_range = (30, 120)  # 30min to 2hrs
-            night_stretch_range = (90, 180)  # 1.5 to 3 hours
-        elif age_months < 6:
-            # 3-6 months: 3-4 naps, longer night stretches
-            num_naps = random.randint(3, 4)
-            night_wakings = random.randint(1, 3)
-            nap_duration_range = (45, 150)
-            night_stretch_range = (180, 300)
-        elif age_months < 12:
-            # 6-12 months: 2-3 naps, mostly through the night
-            num_naps = random.randint(2, 3)
-            night_wakings = random.randint(0, 2)
-            nap_duration_range = (60, 180)
-            night_stretch_range = (300, 480)
-        else:
-            # 12+ months: 1-2 naps, sleeping through
-            num_naps = random.randint(1, 2)
-            night_wakings = random.randint(0, 1)
-            nap_duration_range = (60, 150)
-            night_stretch_range = (480, 660)
-        
+    randint, random = np.random.randint, np.random.random  # Bound once; saves lookups without Numba
+    capacity = num_days * MAX_EVENTS_PER_DAY
+    event_types = np.empty(capacity, dtype=np.int64)
+    starts = np.empty(capacity, dtype=np.int64)
+    durations = np.full(capacity, -1, dtype=np.int64)
+    codes = np.full(capacity, -1, dtype=np.int64)
+    amounts = np.full(capacity, -1, dtype=np.int64)
+    day_counts = np.zeros(num_days, dtype=np.int64)
+
+    for day_index in prange(num_days):
+        day_offset = first_day + day_index
+        np.random.seed(_day_seed(seed, day_offset))
+        day_start = day_offset * 1440
+        first_slot = day_index * MAX_EVENTS_PER_DAY
+        count = first_slot
+        bucket = _age_bucket(day_offset)
+
+        # --- SLEEP ---
+        num_naps = randint(NUM_NAPS[bucket, 0], NUM_NAPS[bucket, 1] + 1)
+        night_wakings = randint(NIGHT_WAKINGS[bucket, 0], NIGHT_WAKINGS[bucket, 1] + 1)
+
         # Generate daytime naps
-        nap_starts = sorted([
-            random.randint(8, 17) * 60 + random.randint(0, 59)  # Minutes from midnight
-            for _ in range(num_naps)
-        ])
-        
-        for nap_start_minutes in nap_starts:
-            nap_duration = random.randint(*nap_duration_range)
-            start_time = current_date.replace(hour=0, minute=0, second=0) + timedelta(minutes=nap_start_minutes)
-            end_time = start_time + timedelta(minutes=nap_duration)
-            
-            duration_str = f"{nap_duration // 60}:{nap_duration % 60:02d}"
-            records.append({
-                'Type': 'sleep',
-                'Start': start_time.strftime('%Y-%m-%d %H:%M'),
-                'End': end_time.strftime('%Y-%m-%d %H:%M'),
-                'Duration': duration_str,
-                'Start Conditions': '',
-                'Start Location': '',
-                'End Conditions': '',
-                'Notes': ''
-            })
-        
+        nap_starts = np.empty(num_naps, dtype=np.int64)
+        for i in range(num_naps):
+            nap_starts[i] = randint(8, 18) * 60 + randint(0, 60)
+        nap_starts.sort()
+
+        for i in range(num_naps):
+            event_types[count] = SLEEP
+            starts[count] = day_start + nap_starts[i]
+            durations[count] = randint(NAP_DURATION[bucket, 0], NAP_DURATION[bucket, 1] + 1)
+            count += 1
+
         # Generate night sleep (evening of this day into next morning)
-        bedtime_hour = random.randint(18, 20)
-        bedtime_minute = random.randint(0, 59)
-        bedtime = current_date.replace(hour=bedtime_hour, minute=bedtime_minute, second=0)
-        
-        wake_hour = random.randint(6, 8)
-        wake_minute = random.randint(0, 59)
-        final_wake = (current_date + timedelta(days=1)).replace(hour=wake_hour, minute=wake_minute, second=0)
-        
+        bedtime = day_start + randint(18, 21) * 60 + randint(0, 60)
+        final_wake = day_start + 1440 + randint(6, 9) * 60 + randint(0, 60)
+
         # Generate night sleep segments based on wakings
         current_sleep_start = bedtime
         for i in range(night_wakings + 1):
             if i < night_wakings:
-                # Calculate wake time
-                remaining_night = (final_wake - current_sleep_start).total_seconds() / 60
+                remaining_night = final_wake - current_sleep_start
                 stretch_duration = min(
-                    random.randint(*night_stretch_range),
-                    int(remaining_night * 0.8)  # Don't use more than 80% of remaining time
+                    randint(NIGHT_STRETCH[bucket, 0], NIGHT_STRETCH[bucket, 1] + 1),
+                    int(remaining_night * 0.8),  # Don't use more than 80% of remaining time
                 )
-                sleep_end = current_sleep_start + timedelta(minutes=stretch_duration)
-                
-                # Brief wake period (10-30 min)
-                wake_duration = random.randint(10, 30)
-                next_sleep_start = sleep_end + timedelta(minutes=wake_duration)
+                sleep_end = current_sleep_start + stretch_duration
             else:
                 # Final stretch to morning
                 sleep_end = final_wake
-            
-            duration_minutes = int((sleep_end - current_sleep_start).total_seconds() / 60)
-            if duration_minutes > 0:
-                duration_str = f"{duration_minutes // 60}:{duration_minutes % 60:02d}"
-                records.append({
-                    'Type': 'sleep',
-                    'Start': current_sleep_start.strftime('%Y-%m-%d %H:%M'),
-                    'End': sleep_end.strftime('%Y-%m-%d %H:%M'),
-                    'Duration': duration_str,
-                    'Start Conditions': '',
-                    'Start Location': '',
-                    'End Conditions': '',
-                    'Notes': ''
-                })
-            
-            if i < night_wakings:
-                current_sleep_start = next_sleep_start
-    
-    return records
 
+            if sleep_end > current_sleep_start:
+                event_types[count] = SLEEP
+                starts[count] = current_sleep_start
+                durations[count] = sleep_end - current_sleep_start
+                count += 1
+
+            # Brief wake period (10-30 min)
+            current_sleep_start = sleep_end + randint(10, 31)
+
+        # --- FEED: frequency decreases with age ---
+        num_feeds = randint(NUM_FEEDS[bucket, 0], NUM_FEEDS[bucket, 1] + 1)
 
-def generate_feed_patterns(start_date: datetime, num_days: int, seed: int = 42) -> list[dict]:
-    """Generate feeding events that decrease in frequency as baby ages."""
-    random.seed(seed + 1)  # Different seed from sleep
-    records = []
-    
-    for day_offset in range(num_days):
-        current_date = start_date + timedelta(days=day_offset)
-        age_months = day_offset / 30
-        
-        # Feeding frequency decreases with age
-        if age_months < 3:
-            num_feeds = random.randint(8, 12)
-        elif age_months < 6:
-            num_feeds = random.randint(6, 8)
-        elif age_months < 12:
-            num_feeds = random.randint(5, 7)
-        else:
-            num_feeds = random.randint(4, 6)
-        
         # Distribute feeds throughout the day
-        feed_times = sorted([
-            random.randint(0, 23) * 60 + random.randint(0, 59)
-            for _ in range(num_feeds)
-        ])
-        
-        feed_types = ['Breast', 'Formula', 'Bottle']
-        amounts = ['2oz', '3oz', '4oz', '5oz', '6oz', '8oz']
-        
-        for feed_minutes in feed_times:
-            feed_time = current_date.replace(hour=0, minute=0, second=0) + timedelta(minutes=feed_minutes)
-            
+        feed_times = np.empty(num_feeds, dtype=np.int64)
+        for i in range(num_feeds):
+            feed_times[i] = randint(0, 24) * 60 + randint(0, 60)
+        feed_times.sort()
+
+        for i in range(num_feeds):
             # Older babies get more formula/solids
-            if age_months > 6:
-                feed_type = random.choice(['Formula', 'Bottle', 'Solids'])
+            if day_offset / 30 > 6:
+                feed_type = randint(1, 4)
             else:
-                feed_type = random.choice(feed_types)
-            
-            amount = random.choice(amounts) if feed_type != 'Breast' else ''
-            
-            records.append({
-                'Type': 'feed',
-                'Start': feed_time.strftime('%Y-%m-%d %H:%M'),
-                'End': '',
-                'Duration': '',
-                'Start Conditions': feed_type,
-                'Start Location': 'bottle' if feed_type in ['Formula', 'Bottle'] else '',
-                'End Conditions': amount,
-                'Notes': ''
-            })
-    
-    return records
+                feed_type = randint(0, 3)
 
+            event_types[count] = FEED
+            starts[count] = day_start + feed_times[i]
+            codes[count] = feed_type
+            if feed_type != 0:
+                amounts[count] = randint(0, len(FEED_AMOUNTS))
+            count += 1
 
-def generate_meds_patterns(start_date: datetime, num_days: int, seed: int = 42) -> list[dict]:
-    """Generate occasional medication events."""
-    random.seed(seed + 2)
-    records = []
-    
-    med_types = ['Tylenol', 'Vitamin D', 'Gas Relief Drops', 'Gripe Water', 'Probiotics']
-    
-    for day_offset in range(num_days):
-        current_date = start_date + timedelta(days=day_offset)
-        
-        # Daily vitamins
-        if random.random() < 0.9:  # 90% chance of vitamin D
-            vitamin_time = current_date.replace(hour=random.randint(8, 10), minute=random.randint(0, 59))
-            records.append({
-                'Type': 'meds',
-                'Start': vitamin_time.strftime('%Y-%m-%d %H:%M'),
-                'End': vitamin_time.strftime('%Y-%m-%d %H:%M'),
-                'Duration': '',
-                'Start Conditions': '1ml',
-                'Start Location': 'Vitamin D',
-                'End Conditions': '',
-                'Notes': ''
-            })
-        
-        # Occasional other meds (5% chance per day for each)
-        for med in ['Tylenol', 'Gas Relief Drops', 'Gripe Water']:
-            if random.random() < 0.05:
-                med_time = current_date.replace(hour=random.randint(8, 20), minute=random.randint(0, 59))
-                dosage = '5ml' if med == 'Tylenol' else '2.5ml'
-                records.append({
-                    'Type': 'meds',
-                    'Start': med_time.strftime('%Y-%m-%d %H:%M'),
-                    'End': med_time.strftime('%Y-%m-%d %H:%M'),
-                    'Duration': '',
-                    'Start Conditions': dosage,
-                    'Start Location': med,
-                    'End Conditions': '',
-                    'Notes': ''
-                })
-    
-    return records
+        # --- MEDS: daily vitamins (90% chance of vitamin D), occasional others (5% each) ---
+        for med in range(len(MED_NAMES)):
+            chance = 0.9 if med == 0 else 0.05
+            if random() < chance:
+                first_hour, last_hour = (8, 10) if med == 0 else (8, 20)
+                hour = randint(first_hour, last_hour + 1)
+                event_types[count] = MEDS
+                starts[count] = day_start + hour * 60 + randint(0, 60)
+                codes[count] = med
+                count += 1
 
+        day_counts[day_index] = count - first_slot
 
-def write_csv(records: list[dict], output_path: Path) -> None:
-    """Write records to CSV in Huckleberry format."""
-    headers = ['Type', 'Start', 'End', 'Duration', 'Start Conditions', 'Start Location', 'End Conditions', 'Notes']
-    
-    # Sort by start time descending (newest first, like Huckleberry export)
-    records.sort(key=lambda r: r['Start'], reverse=True)
-    
-    with open(output_path, 'w') as f:
-        f.write(','.join(headers) + '\n')
-        for record in records:
-            row = [f'"{record.get(h, "")}"' if ',' in str(record.get(h, '')) else str(record.get(h, '')) 
-                   for h in headers]
-            f.write(','.join(row) + '\n')
-    
-    print(f"Generated {len(records)} records -> {output_path}")
+    # Drop each day's unused slots
+    used = np.empty(capacity, dtype=np.bool_)
+    for day_index in range(num_days):
+        for slot in range(MAX_EVENTS_PER_DAY):
+            used[day_index * MAX_EVENTS_PER_DAY + slot] = slot < day_counts[day_index]
+
+    return (
+        event_types[used],
+        starts[used],
+        durations[used],
+        codes[used],
+        amounts[used],
+    )
+
+
+# 'H:MM' strings for every duration up to a full day, indexed by minutes
+DURATION_STRINGS = np.array([f'{m // 60}:{m % 60:02d}' for m in range(1441)])
+
+
+def timestamp_table(start_date: np.datetime64, num_days: int) -> np.ndarray:
+    """
+    'YYYY-MM-DD HH:MM' strings for every minute from start_date, indexed by minute offset.
+
+    Covers one extra day so night sleep that ends the morning after the last day
+    can still be looked up.
+    """
+    minutes = np.arange((num_days + 1) * 1440).astype('timedelta64[m]')
+    iso = (start_date.astype('datetime64[m]') + minutes).astype(str)
+    return np.char.replace(iso, 'T', ' ')
+
+
+@dataclass
+class Events:
+    """
+    Generated records as typed columns, one array per field.
+
+    Records stay numeric while they're generated, sorted, and held back between
+    chunks, and are only turned into strings by format_columns just before writing.
+    start and duration are in minutes, start counted from start_date midnight. code
+    is the FEED_TYPES index for feeds and the MED_NAMES index for meds; amount is the
+    FEED_AMOUNTS index for bottle feeds. Unused fields are -1.
+    """
+
+    event_type: np.ndarray
+    start: np.ndarray
+    duration: np.ndarray
+    code: np.ndarray
+    amount: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def take(self, index: np.ndarray) -> 'Events':
+        """Records selected by an index or boolean mask, in that order."""
+        return Events(*(getattr(self, f.name)[index] for f in fields(self)))
+
+    @classmethod
+    def concat(cls, parts: Iterable['Events']) -> 'Events':
+        parts = list(parts)
+        return cls(*(np.concatenate([getattr(p, f.name) for p in parts]) for f in fields(cls)))
+
+
+def generate_days(first_day: int, num_days: int, seed: int = 42) -> Events:
+    """
+    Generate realistic sleep, feed, and meds records that evolve over time.
+
+    Newborns (0-3 months): Many short naps, frequent night wakings
+    Infants (3-6 months): Consolidating to 3-4 naps, longer night stretches
+    Older infants (6-12 months): 2-3 naps, mostly sleeping through night
+    Toddlers (12+ months): 1-2 naps, consistent night sleep
+
+    Feeding frequency decreases with age; medications are occasional.
+
+    Covers days first_day to first_day + num_days - 1, counted from the start date.
+    """
+    return Events(*_gen_core(first_day, num_days, seed))
+
+
+def format_columns(events: Events, start_date: np.datetime64) -> dict[str, np.ndarray]:
+    """Format records as one string array per Huckleberry column."""
+    event_types, starts, durations, codes, amounts = (
+        events.event_type, events.start, events.duration, events.code, events.amount
+    )
+    is_sleep = event_types == SLEEP
+    is_feed = event_types == FEED
+    is_meds = event_types == MEDS
+    is_bottle = is_feed & ((codes == 1) | (codes == 2))
+
+    # Sleep ends after its duration, meds end when they start, feeds have no end
+    ends = np.where(is_sleep, starts + durations, starts)
+
+    # Format every minute of the days these records span once, then look timestamps up by offset
+    first_day = int(starts.min()) // 1440 if len(events) else 0
+    last_day = int(ends.max()) // 1440 if len(events) else 0
+    timestamps = timestamp_table(start_date + first_day, last_day - first_day)
+    first_minute = first_day * 1440
+
+    return {
+        'Type': np.array(EVENT_TYPES)[event_types],
+        'Start': timestamps[starts - first_minute],
+        'End': np.where(is_feed, '', timestamps[ends - first_minute]),
+        'Duration': np.where(is_sleep, DURATION_STRINGS[durations], ''),
+        'Start Conditions': np.select(
+            [is_feed, is_meds], [np.array(FEED_TYPES)[codes], np.array(MED_DOSAGES)[codes]], ''
+        ),
+        'Start Location': np.select([is_bottle, is_meds], ['bottle', np.array(MED_NAMES)[codes]], ''),
+        'End Conditions': np.where(amounts >= 0, np.array(FEED_AMOUNTS)[amounts], ''),
+        'Notes': np.full(len(starts), ''),
+    }
+
+
+def generate_newest_first(num_days: int, seed: int = 42) -> Iterator[Events]:
+    """
+    Yield records DAYS_PER_CHUNK days at a time, newest first (like Huckleberry export).
+
+    Only one chunk is held in memory at a time. Records come out sorted by start time
+    descending across all chunks, not just within each one.
+    """
+    pending = None
+    for first_day in reversed(range(0, num_days, DAYS_PER_CHUNK)):
+        events = generate_days(first_day, min(DAYS_PER_CHUNK, num_days - first_day), seed)
+        if pending is not None:
+            events = Events.concat([events, pending])
+        events = events.take(np.argsort(-events.start, kind='stable'))
+
+        # Night sleep from the previous (older) chunk runs into the morning of this chunk's
+        # first day, so hold that day back until the older records have been generated
+        ready = events.start >= (first_day + 1) * 1440
+        yield events.take(ready)
+        pending = events.take(~ready)
+
+    if pending is not None:
+        yield pending
+
+
+def write_csv(chunks: Iterable[dict[str, np.ndarray]], output_path: Path) -> Counter:
+    """
+    Write chunks of records to CSV in Huckleberry format, in the order given.
+
+    Returns the number of records written of each type.
+    """
+    counts = Counter()
+    header = ','.join(COLUMNS) + '\n'
+
+    if HAS_PYARROW:
+        # Every value comes from the fixed tables above, so none of them needs quoting
+        options = pacsv.WriteOptions(include_header=False, quoting_style='none')
+        with open(output_path, 'wb') as f:
+            f.write(header.encode())  # Arrow would quote the header; Huckleberry doesn't
+            for columns in chunks:
+                pacsv.write_csv(pa.table(columns), f, write_options=options)
+                counts.update(columns['Type'].tolist())
+    else:
+        with open(output_path, 'w', newline='', buffering=1 << 20) as f:
+            f.write(header)
+            writer = csv.writer(f, lineterminator='\n')
+            for columns in chunks:
+                writer.writerows(zip(*columns.values()))
+                counts.update(columns['Type'].tolist())
+
+    print(f"Generated {sum(counts.values())} records -> {output_path}")
+    return counts
 
 
 def main():
@@ -261,28 +389,20 @@ def main():
     
     args = parser.parse_args()
     
-    start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
+    start_date = np.datetime64(args.start_date, 'D')
     output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     print(f"Generating {args.days} days of synthetic data starting from {args.start_date}")
     
-    # Generate all record types
-    records = []
-    records.extend(generate_sleep_patterns(start_date, args.days, args.seed))
-    records.extend(generate_feed_patterns(start_date, args.days, args.seed))
-    records.extend(generate_meds_patterns(start_date, args.days, args.seed))
-    
-    write_csv(records, output_path)
-    
-    # Print summary
-    sleep_count = sum(1 for r in records if r['Type'] == 'sleep')
-    feed_count = sum(1 for r in records if r['Type'] == 'feed')
-    meds_count = sum(1 for r in records if r['Type'] == 'meds')
-    print(f"  Sleep records: {sleep_count}")
-    print(f"  Feed records: {feed_count}")
-    print(f"  Meds records: {meds_count}")
+    # Generate and write a chunk of days at a time, newest first
+    chunks = generate_newest_first(args.days, args.seed)
+    counts = write_csv((format_columns(events, start_date) for events in chunks), output_path)
 
+    # Print summary
+    print(f"  Sleep records: {counts['sleep']}")
+    print(f"  Feed records: {counts['feed']}")
+    print(f"  Meds records: {counts['meds']}")
 
 if __name__ == '__main__':
     main()
@@ -167,10 +167,7 @@ def parse_data(
     med_buckets = {med_type: set() for med_type in known_meds + ['Other']}
     
     # Process sleep intervals
-    for _, row in sleep_df.iterrows():
-        start = row[start_col]
-        end = row[end_col]
-        
+    for start, end in zip(sleep_df[start_col], sleep_df[end_col]):
         # Round to bucket boundaries
         start_bucket = start.replace(second=0, microsecond=0)
         start_bucket = start_bucket - timedelta(minutes=start_bucket.minute % bucket_minutes)
@@ -194,9 +191,7 @@ def parse_data(
     print(f"Marked {len(asleep_buckets)} buckets as asleep")
     
     # Process meds events
-    for _, row in meds_df.iterrows():
-        ts = row[start_col]
-        med_type = row['med_type']
+    for ts, med_type in zip(meds_df[start_col], meds_df['med_type']):
         boundary = get_day_boundary(ts, day_start_hour)
         day_num = (boundary - day_zero).days
         minute_of_day = get_minute_of_day(ts, day_start_hour)
@@ -210,8 +205,7 @@ def parse_data(
             print(f"Marked {len(med_buckets[med_type])} buckets with {med_type}")
     
     # Process feed events
-    for _, row in feed_df.iterrows():
-        ts = row[start_col]
+    for ts in feed_df[start_col]:
         boundary = get_day_boundary(ts, day_start_hour)
         day_num = (boundary - day_zero).days
         minute_of_day = get_minute_of_day(ts, day_start_hour)
@@ -5,14 +5,57 @@ This package converts baby tracking data exports (from apps like Huckleberry, Ba
 and others) into beautiful heatmap visualizations showing sleep, feeding, and medication patterns.
 """
 
-__version__ = "0.1.0"
+import sys
+from types import ModuleType
 
-from .parse_data import get_day_boundary, get_minute_of_day, parse_data
-from .visualize import create_visualization
+__version__ = "0.1.0"
 
 __all__ = [
     "parse_data",
+    "bucket_data",
+    "BucketedData",
     "create_visualization",
+    "create_visualization_from_arrays",
     "get_day_boundary",
     "get_minute_of_day",
 ]
+
+# Public names and the submodule that defines them. They're imported on first access
+# (PEP 562) so `import babysleepviz` doesn't pull in pandas and matplotlib.
+_LAZY_ATTRS = {
+    "parse_data": ".parse_data",
+    "bucket_data": ".parse_data",
+    "BucketedData": ".parse_data",
+    "get_day_boundary": ".parse_data",
+    "get_minute_of_day": ".parse_data",
+    "create_visualization": ".visualize",
+    "create_visualization_from_arrays": ".visualize",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(ModuleType):
+    """Package module that keeps parse_data naming the function, not its submodule."""
+
+    def __setattr__(self, name, value):
+        # Importing babysleepviz.parse_data binds the submodule as a package attribute,
+        # which would hide the lazily loaded parse_data function
+        if name == "parse_data" and isinstance(value, ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
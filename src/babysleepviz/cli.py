@@ -10,13 +10,25 @@ Commands:
 """
 
 import argparse
-import tempfile
 from datetime import datetime
 from pathlib import Path
 
-from .parse_data import load_config, parse_data
-from .visualize import create_visualization
-from .visualize import load_config as load_viz_config
+
+def _parse_ymd(s: str) -> datetime:
+    """Parse a YYYY-MM-DD date string without going through strptime."""
+    fields = (s[:4], s[5:7], s[8:10])
+    # int() alone would also accept signs, spaces and non-ASCII digits in each field
+    if (
+        len(s) == 10
+        and s[4] == "-"
+        and s[7] == "-"
+        and all(f.isascii() and f.isdigit() for f in fields)
+    ):
+        try:
+            return datetime(*(int(f) for f in fields))
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date {s!r}: expected YYYY-MM-DD format (e.g., 2024-01-15)")
 
 
 def parse_cli():
@@ -36,7 +48,7 @@ def parse_cli():
         "--output",
         type=str,
         default="local/buckets.csv",
-        help="Output CSV file path (default: local/buckets.csv)",
+        help="Output file path; a .parquet suffix writes Parquet (default: local/buckets.csv)",
     )
     parser.add_argument(
         "-c",
@@ -68,6 +80,9 @@ def parse_cli():
         )
         return 1
 
+    # Imported here so --help and bad-path errors don't pay for pandas
+    from .parse_data import load_config, parse_data
+
     if config_path.exists():
         config = load_config(config_path)
         print(f"Loaded config: {config.get('name', 'unknown')}")
@@ -96,7 +111,7 @@ def render_cli():
         type=str,
         nargs="?",
         default="local/buckets.csv",
-        help="Input bucketed CSV file path (default: local/buckets.csv)",
+        help="Input bucketed CSV or .parquet file path (default: local/buckets.csv)",
     )
     parser.add_argument(
         "-o",
@@ -151,6 +166,9 @@ def render_cli():
         print("First run: babysleepviz-parse <your_data.csv>")
         return 1
 
+    from .visualize import create_visualization
+    from .visualize import load_config as load_viz_config
+
     if config_path.exists():
         config = load_viz_config(config_path)
         print(f"Loaded config: {config.get('name', 'unknown')}")
@@ -158,7 +176,7 @@ def render_cli():
         print(f"Warning: Config not found at {config_path}, using defaults")
         config = {}
 
-    day_zero = datetime.strptime(args.day_zero, "%Y-%m-%d").replace(hour=args.day_start_hour)
+    day_zero = _parse_ymd(args.day_zero).replace(hour=args.day_start_hour)
 
     create_visualization(
         input_path=input_path,
@@ -232,7 +250,7 @@ def main_cli():
         "--save-buckets",
         type=str,
         default=None,
-        help="Optional: save intermediate bucketed data to this CSV path",
+        help="Optional: save intermediate bucketed data to this CSV (or .parquet) path",
     )
 
     args = parser.parse_args()
@@ -250,7 +268,10 @@ def main_cli():
         print("  3. Run: babysleepviz local/your_export.csv --day-zero YYYY-MM-DD")
         return 1
 
-    # Load config
+    from .parse_data import bucket_data, load_config, print_summary, write_buckets
+    from .visualize import create_visualization_from_arrays
+
+    # Load config once; parsing and visualization read different keys of the same file
     if config_path.exists():
         config = load_config(config_path)
         print(f"Loaded config: {config.get('name', 'unknown')}")
@@ -258,66 +279,46 @@ def main_cli():
         print(f"Warning: Config not found at {config_path}, using defaults")
         config = {}
 
-    # Determine where to save bucketed data
-    if args.save_buckets:
-        buckets_path = Path(args.save_buckets)
-        cleanup_buckets = False
-    else:
-        # Use a temporary file
-        temp_file = tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False)
-        buckets_path = Path(temp_file.name)
-        temp_file.close()
-        cleanup_buckets = True
-
-    try:
-        # Step 1: Parse CSV to buckets
-        print("=" * 60)
-        print("Step 1: Parsing tracking data...")
-        print("=" * 60)
-        parse_data(
-            input_path=input_path,
-            output_path=buckets_path,
-            config=config,
-            day_start_hour=args.day_start_hour,
-            bucket_minutes=args.bucket_minutes,
-        )
+    # Bucketed data stays in memory as arrays; only write it out if asked to
+    buckets_path = Path(args.save_buckets) if args.save_buckets else None
 
-        # Step 2: Generate visualization
-        print()
-        print("=" * 60)
-        print("Step 2: Generating visualization...")
-        print("=" * 60)
-
-        day_zero = datetime.strptime(args.day_zero, "%Y-%m-%d").replace(hour=args.day_start_hour)
-
-        # Reload config for visualization (may have different settings)
-        if config_path.exists():
-            viz_config = load_viz_config(config_path)
-        else:
-            viz_config = {}
-
-        create_visualization(
-            input_path=buckets_path,
-            output_path=output_path,
-            config=viz_config,
-            day_zero=day_zero,
-            birthday_day=args.birthday_day,
-            max_months=args.max_months,
-            day_start_hour=args.day_start_hour,
-            bucket_minutes=args.bucket_minutes,
-        )
+    # Step 1: Parse CSV to buckets
+    print("=" * 60)
+    print("Step 1: Parsing tracking data...")
+    print("=" * 60)
+    buckets = bucket_data(
+        input_path=input_path,
+        config=config,
+        day_start_hour=args.day_start_hour,
+        bucket_minutes=args.bucket_minutes,
+    )
+    if buckets_path is not None:
+        write_buckets(buckets.to_dataframe(), buckets_path)
+    print_summary(buckets)
 
-        print()
-        print("=" * 60)
-        print(f"Done! Visualization saved to: {output_path}")
-        if args.save_buckets:
-            print(f"Bucketed data saved to: {buckets_path}")
-        print("=" * 60)
-
-    finally:
-        # Clean up temporary file if we created one
-        if cleanup_buckets and buckets_path.exists():
-            buckets_path.unlink()
+    # Step 2: Generate visualization
+    print()
+    print("=" * 60)
+    print("Step 2: Generating visualization...")
+    print("=" * 60)
+
+    day_zero = _parse_ymd(args.day_zero).replace(hour=args.day_start_hour)
+
+    create_visualization_from_arrays(
+        buckets,
+        output_path=output_path,
+        config=config,
+        day_zero=day_zero,
+        birthday_day=args.birthday_day,
+        max_months=args.max_months,
+    )
+
+    print()
+    print("=" * 60)
+    print(f"Done! Visualization saved to: {output_path}")
+    if buckets_path is not None:
+        print(f"Bucketed data saved to: {buckets_path}")
+    print("=" * 60)
 
     return 0
 
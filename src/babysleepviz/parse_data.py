@@ -5,9 +5,11 @@ This module converts raw sleep/feed/meds data into 5-minute time buckets,
 making it suitable for heatmap visualization.
 """
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 try:
@@ -23,8 +25,10 @@ def load_config(config_path: Path) -> dict:
     if not HAS_YAML:
         print("Warning: PyYAML not installed, using default configuration")
         return {}
+    # The libyaml-backed loader is much faster when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     with open(config_path) as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=loader)
 
 
 def get_day_boundary(ts: datetime, day_start_hour: int = 7) -> datetime:
@@ -63,6 +67,78 @@ def get_minute_of_day(ts: datetime, day_start_hour: int = 7) -> int:
     return int(delta.total_seconds() // 60)
 
 
+def get_day_boundaries(ts: pd.Series, day_start_hour: int = 7) -> pd.Series:
+    """
+    Vectorized get_day_boundary over a Series of timestamps.
+
+    Args:
+        ts: Timestamps to find boundaries for
+        day_start_hour: Hour that starts each "day"
+
+    Returns:
+        Series with the start of the "day" each timestamp belongs to
+    """
+    offset = pd.Timedelta(hours=day_start_hour)
+    return (ts - offset).dt.floor("D") + offset
+
+
+def get_minutes_of_day(ts: pd.Series, day_start_hour: int = 7) -> pd.Series:
+    """
+    Vectorized get_minute_of_day over a Series of timestamps.
+
+    Args:
+        ts: Timestamps to convert
+        day_start_hour: Hour that starts each "day"
+
+    Returns:
+        Series of minutes since each timestamp's day boundary
+    """
+    delta = ts - get_day_boundaries(ts, day_start_hour)
+    return (delta.dt.total_seconds() // 60).astype(np.int64)
+
+
+def _mark_sleep_buckets_numpy(
+    start_min: np.ndarray,
+    end_min: np.ndarray,
+    bucket_minutes: int,
+    total_days: int,
+    out: np.ndarray,
+) -> None:
+    """Set out[day * buckets_per_day + bucket] for every bucket start in each interval."""
+    buckets_per_day = len(out) // total_days
+    minutes = np.concatenate(
+        [np.empty(0, dtype=np.int64)]
+        + [np.arange(s, e, bucket_minutes) for s, e in zip(start_min, end_min)]
+    )
+    day_num, minute_of_day = np.divmod(minutes, 24 * 60)
+    in_range = (day_num >= 0) & (day_num < total_days)
+    out[day_num[in_range] * buckets_per_day + minute_of_day[in_range] // bucket_minutes] = 1
+
+
+# Numba is optional; it's only needed for the compiled kernel below
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+
+    @njit(cache=True)
+    def _mark_sleep_buckets(start_min, end_min, bucket_minutes, total_days, out):
+        """Compiled _mark_sleep_buckets_numpy: one pass, no intermediate index arrays."""
+        buckets_per_day = len(out) // total_days
+        for i in range(len(start_min)):
+            for minute in range(start_min[i], end_min[i], bucket_minutes):
+                day_num = minute // 1440
+                if 0 <= day_num < total_days:
+                    out[day_num * buckets_per_day + (minute % 1440) // bucket_minutes] = 1
+
+else:
+    _mark_sleep_buckets = _mark_sleep_buckets_numpy
+
+
 def normalize_med_name(name: str, known_meds: list[str]) -> str:
     """Normalize medication names to known types or 'Other'."""
     if pd.isna(name):
@@ -81,25 +157,98 @@ def normalize_med_name(name: str, known_meds: list[str]) -> str:
     return "Other"
 
 
-def parse_data(
+def normalize_med_names(names: pd.Series, known_meds: list[str]) -> pd.Series:
+    """Vectorized normalize_med_name over a Series of medication names."""
+    stripped = names.str.strip()
+    lower = stripped.str.lower()
+    conditions = [
+        lower.str.contains("tylenol", regex=False, na=False).to_numpy(),
+        lower.str.contains("ibuprofen|motrin", na=False).to_numpy(),
+        stripped.isin(known_meds).to_numpy(),
+    ]
+    choices = ["Tylenol", "Motrin", stripped.to_numpy(dtype=object)]
+    return pd.Series(np.select(conditions, choices, default="Other"), index=names.index)
+
+
+@dataclass
+class BucketedData:
+    """
+    Time-bucketed flags as int8 matrices of shape (buckets per day, days).
+
+    Row r of day d covers the bucket starting r * bucket_minutes minutes after that
+    day's day_start_hour boundary; 1 means the event happened in that bucket.
+    """
+
+    asleep: np.ndarray
+    feed: np.ndarray
+    meds: dict[str, np.ndarray]
+    day_zero: datetime | None = None
+    day_start_hour: int = 7
+    bucket_minutes: int = 5
+
+    @property
+    def num_days(self) -> int:
+        return self.asleep.shape[1]
+
+    @property
+    def buckets_per_day(self) -> int:
+        return self.asleep.shape[0]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """One row per bucket, in (day, minute_of_day) order, as written by parse_data."""
+        bucket_starts = np.arange(self.buckets_per_day, dtype=np.int32) * self.bucket_minutes
+        columns = {
+            "day": np.repeat(np.arange(self.num_days, dtype=np.int32), self.buckets_per_day),
+            "minute_of_day": np.tile(bucket_starts, self.num_days),
+            "asleep": self.asleep.T.ravel(),
+            "feed": self.feed.T.ravel(),
+        }
+        for med_type, matrix in self.meds.items():
+            columns[f"med_{med_type}"] = matrix.T.ravel()
+        return pd.DataFrame(columns)
+
+    @classmethod
+    def from_dataframe(
+        cls, df: pd.DataFrame, day_start_hour: int = 7, bucket_minutes: int = 5
+    ) -> "BucketedData":
+        """Rebuild the matrices from bucketed rows, e.g. a CSV written by parse_data."""
+        num_days = df["day"].nunique()
+        buckets_per_day = df["minute_of_day"].nunique()
+
+        # The buckets form a dense (day, minute_of_day) grid, so once rows are in that
+        # order each column reshapes straight into a (minute, day) matrix
+        df = df.sort_values(["day", "minute_of_day"], kind="stable")
+
+        def to_matrix(col_name: str) -> np.ndarray:
+            return df[col_name].to_numpy().reshape(num_days, buckets_per_day).T
+
+        meds = {col[len("med_") :]: to_matrix(col) for col in df.columns if col.startswith("med_")}
+        return cls(
+            asleep=to_matrix("asleep"),
+            feed=to_matrix("feed"),
+            meds=meds,
+            day_start_hour=day_start_hour,
+            bucket_minutes=bucket_minutes,
+        )
+
+
+def bucket_data(
     input_path: Path,
-    output_path: Path,
     config: dict,
     day_start_hour: int = 7,
     bucket_minutes: int = 5,
-) -> pd.DataFrame:
+) -> BucketedData:
     """
-    Parse baby tracking CSV and convert to time-bucketed format.
+    Parse baby tracking CSV into time-bucketed flag matrices.
 
     Args:
         input_path: Path to input CSV file
-        output_path: Path for output CSV file
         config: Data source configuration dict
         day_start_hour: Hour that starts each "day" (default: 7am)
         bucket_minutes: Size of time buckets in minutes (default: 5)
 
     Returns:
-        DataFrame with bucketed data
+        BucketedData with one matrix per event type
     """
     # Load column mappings from config
     columns = config.get("columns", {})
@@ -126,153 +275,120 @@ def parse_data(
         ],
     )
 
-    # Load the CSV
-    df = pd.read_csv(input_path)
+    # Load the CSV, parsing both timestamp columns once up front. Type and medication
+    # name repeat a handful of values, so as categoricals the type filters below compare
+    # integer codes and the string cleanup runs once per distinct name.
+    df = pd.read_csv(
+        input_path,
+        parse_dates=[start_col, end_col],
+        dtype={type_col: "category", med_name_col: "category"},
+    )
+    # read_csv leaves a column as strings when it can't infer one format for it
+    for col in (start_col, end_col):
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
 
     # --- SLEEP: intervals with Start and End ---
-    sleep_df = df[(df[type_col] == sleep_type) & (df[end_col].notna() & (df[end_col] != ""))].copy()
-    sleep_df[start_col] = pd.to_datetime(sleep_df[start_col])
-    sleep_df[end_col] = pd.to_datetime(sleep_df[end_col])
-    sleep_df = sleep_df.dropna(subset=[start_col, end_col])
+    sleep_df = df[df[type_col] == sleep_type].dropna(subset=[start_col, end_col])
     print(f"Found {len(sleep_df)} valid sleep records")
 
     # --- MEDS: point-in-time events with medication type ---
-    meds_df = df[df[type_col] == meds_type].copy()
-    meds_df[start_col] = pd.to_datetime(meds_df[start_col])
-    meds_df = meds_df.dropna(subset=[start_col])
+    meds_df = df[df[type_col] == meds_type].dropna(subset=[start_col])
     meds_df["med_name"] = meds_df[med_name_col].str.strip().str.replace('"', "")
-    meds_df["med_type"] = meds_df["med_name"].apply(lambda x: normalize_med_name(x, known_meds))
+    meds_df["med_type"] = normalize_med_names(meds_df["med_name"], known_meds)
     print(f"Found {len(meds_df)} meds records")
     if len(meds_df) > 0:
         print(f"Medication types: {meds_df['med_type'].value_counts().to_dict()}")
 
     # --- FEED: point-in-time events ---
-    feed_df = df[df[type_col] == feed_type].copy()
-    feed_df[start_col] = pd.to_datetime(feed_df[start_col])
-    feed_df = feed_df.dropna(subset=[start_col])
+    feed_df = df[df[type_col] == feed_type].dropna(subset=[start_col])
     print(f"Found {len(feed_df)} feed records")
 
     # Find date range
     all_starts = pd.concat([sleep_df[start_col], meds_df[start_col], feed_df[start_col]])
-    all_boundaries = all_starts.apply(lambda x: get_day_boundary(x, day_start_hour))
-    day_zero = all_boundaries.min()
+    day_zero = get_day_boundaries(all_starts, day_start_hour).min()
     print(f"Day 0 starts at: {day_zero}")
 
     all_ends = pd.concat([sleep_df[end_col], meds_df[start_col], feed_df[start_col]])
-    latest_end_boundaries = all_ends.apply(lambda x: get_day_boundary(x, day_start_hour))
-    last_day_boundary = latest_end_boundaries.max()
+    last_day_boundary = get_day_boundaries(all_ends, day_start_hour).max()
     total_days = (last_day_boundary - day_zero).days + 1
     print(f"Total days to cover: {total_days}")
 
-    # Create all possible buckets
-    all_buckets = []
-    for day in range(total_days):
-        for minute in range(0, 24 * 60, bucket_minutes):
-            bucket = {
-                "day": day,
-                "minute_of_day": minute,
-                "asleep": 0,
-                "feed": 0,
-            }
-            for med_type in known_meds:
-                bucket[f"med_{med_type}"] = 0
-            bucket["med_Other"] = 0
-            all_buckets.append(bucket)
-
-    buckets_df = pd.DataFrame(all_buckets)
-    print(f"Created {len(buckets_df)} total buckets")
-
-    # Create sets to track marked buckets
-    asleep_buckets = set()
-    feed_buckets = set()
-    med_buckets = {med_type: set() for med_type in known_meds + ["Other"]}
-
-    # Process sleep intervals
-    for _, row in sleep_df.iterrows():
-        start = row[start_col]
-        end = row[end_col]
-
-        # Round to bucket boundaries
-        start_bucket = start.replace(second=0, microsecond=0)
-        start_bucket = start_bucket - timedelta(minutes=start_bucket.minute % bucket_minutes)
-
-        end_bucket = end.replace(second=0, microsecond=0)
-        if end.second > 0 or end.microsecond > 0 or end.minute % bucket_minutes != 0:
-            end_bucket = end_bucket + timedelta(
-                minutes=bucket_minutes - (end_bucket.minute % bucket_minutes)
-            )
-
-        current = start_bucket
-        while current < end:
-            boundary = get_day_boundary(current, day_start_hour)
-            day_num = (boundary - day_zero).days
-            minute_of_day = get_minute_of_day(current, day_start_hour)
-            minute_of_day = (minute_of_day // bucket_minutes) * bucket_minutes
-
-            if 0 <= day_num < total_days:
-                asleep_buckets.add((day_num, minute_of_day))
-
-            current += timedelta(minutes=bucket_minutes)
-
-    print(f"Marked {len(asleep_buckets)} buckets as asleep")
+    # Each flag array covers every bucket, day by day: index day * buckets_per_day + bucket
+    buckets_per_day = len(range(0, 24 * 60, bucket_minutes))
+    total_buckets = total_days * buckets_per_day
+    print(f"Created {total_buckets} total buckets")
+
+    def mark_buckets(day_num: np.ndarray, minute_of_day: np.ndarray) -> np.ndarray:
+        """int8 flags over the bucket grid, set for each in-range (day, minute of day)."""
+        flags = np.zeros(total_buckets, dtype=np.int8)
+        in_range = (day_num >= 0) & (day_num < total_days)
+        flags[day_num[in_range] * buckets_per_day + minute_of_day[in_range] // bucket_minutes] = 1
+        return flags
+
+    # Process sleep intervals as minutes since day_zero. Starts round down to the bucket
+    # they fall in; every bucket start before the end of the interval is asleep.
+    one_minute = pd.Timedelta(minutes=1)
+    sleep_start = sleep_df[start_col].dt.floor("min")
+    start_min = (
+        (sleep_start - day_zero) // one_minute - sleep_start.dt.minute % bucket_minutes
+    ).to_numpy(dtype=np.int64)
+    end_min = np.ceil((sleep_df[end_col] - day_zero) / one_minute).to_numpy(dtype=np.int64)
+
+    asleep = np.zeros(total_buckets, dtype=np.int8)
+    _mark_sleep_buckets(start_min, end_min, bucket_minutes, total_days, asleep)
+
+    print(f"Marked {asleep.sum()} buckets as asleep")
+
+    def bucket_positions(ts: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        """Day number and minute of day for each timestamp."""
+        day_num = (get_day_boundaries(ts, day_start_hour) - day_zero).dt.days.to_numpy()
+        return day_num, get_minutes_of_day(ts, day_start_hour).to_numpy()
 
     # Process meds events
-    for _, row in meds_df.iterrows():
-        ts = row[start_col]
-        med_type = row["med_type"]
-        boundary = get_day_boundary(ts, day_start_hour)
-        day_num = (boundary - day_zero).days
-        minute_of_day = get_minute_of_day(ts, day_start_hour)
-        minute_of_day = (minute_of_day // bucket_minutes) * bucket_minutes
-
-        if 0 <= day_num < total_days:
-            med_buckets[med_type].add((day_num, minute_of_day))
-
+    day_num, minute_of_day = bucket_positions(meds_df[start_col])
+    med_types = meds_df["med_type"].to_numpy()
+    med_flags = {}
     for med_type in known_meds + ["Other"]:
-        if len(med_buckets[med_type]) > 0:
-            print(f"Marked {len(med_buckets[med_type])} buckets with {med_type}")
+        is_type = med_types == med_type
+        med_flags[med_type] = mark_buckets(day_num[is_type], minute_of_day[is_type])
+        if med_flags[med_type].any():
+            print(f"Marked {med_flags[med_type].sum()} buckets with {med_type}")
 
     # Process feed events
-    for _, row in feed_df.iterrows():
-        ts = row[start_col]
-        boundary = get_day_boundary(ts, day_start_hour)
-        day_num = (boundary - day_zero).days
-        minute_of_day = get_minute_of_day(ts, day_start_hour)
-        minute_of_day = (minute_of_day // bucket_minutes) * bucket_minutes
+    feed = mark_buckets(*bucket_positions(feed_df[start_col]))
 
-        if 0 <= day_num < total_days:
-            feed_buckets.add((day_num, minute_of_day))
+    print(f"Marked {feed.sum()} buckets with feed")
 
-    print(f"Marked {len(feed_buckets)} buckets with feed")
+    def to_matrix(flags: np.ndarray) -> np.ndarray:
+        return flags.reshape(total_days, buckets_per_day).T
 
-    # Update DataFrame
-    buckets_df["asleep"] = buckets_df.apply(
-        lambda row: 1 if (row["day"], row["minute_of_day"]) in asleep_buckets else 0, axis=1
-    )
-    buckets_df["feed"] = buckets_df.apply(
-        lambda row: 1 if (row["day"], row["minute_of_day"]) in feed_buckets else 0, axis=1
+    return BucketedData(
+        asleep=to_matrix(asleep),
+        feed=to_matrix(feed),
+        meds={med_type: to_matrix(flags) for med_type, flags in med_flags.items()},
+        day_zero=day_zero.to_pydatetime(),
+        day_start_hour=day_start_hour,
+        bucket_minutes=bucket_minutes,
     )
 
-    for med_type in known_meds + ["Other"]:
-        col_name = f"med_{med_type}"
-        buckets_df[col_name] = buckets_df.apply(
-            lambda row, mt=med_type: (
-                1 if (row["day"], row["minute_of_day"]) in med_buckets[mt] else 0
-            ),
-            axis=1,
-        )
-
-    # Sort and save
-    buckets_df = buckets_df.sort_values(["day", "minute_of_day"]).reset_index(drop=True)
-    buckets_df.to_csv(output_path, index=False)
 
+def write_buckets(buckets_df: pd.DataFrame, output_path: Path) -> None:
+    """Write bucketed data as Parquet if output_path ends in .parquet, else as CSV."""
+    if Path(output_path).suffix == ".parquet":
+        buckets_df.to_parquet(output_path, index=False, compression="zstd")
+    else:
+        buckets_df.to_csv(output_path, index=False)
     print(f"\nSaved to {output_path}")
-    print(f"Shape: {buckets_df.shape}")
 
-    # Summary stats
-    total_asleep = buckets_df["asleep"].sum()
-    total_feed = buckets_df["feed"].sum()
-    total_buckets = len(buckets_df)
+
+def print_summary(data: BucketedData) -> None:
+    """Print bucket totals and per-day averages."""
+    total_asleep = data.asleep.sum()
+    total_feed = data.feed.sum()
+    total_buckets = data.asleep.size
+    total_days = data.num_days
+    bucket_minutes = data.bucket_minutes
     print("\nSummary:")
     print(f"Total buckets: {total_buckets}")
     print(f"Asleep buckets: {total_asleep} ({100 * total_asleep / total_buckets:.2f}%)")
@@ -282,4 +398,36 @@ def parse_data(
     )
     print(f"Average feeds per day: {total_feed / total_days:.2f}")
 
+
+def parse_data(
+    input_path: Path,
+    output_path: Path | None,
+    config: dict,
+    day_start_hour: int = 7,
+    bucket_minutes: int = 5,
+) -> pd.DataFrame:
+    """
+    Parse baby tracking CSV and convert to time-bucketed format.
+
+    Args:
+        input_path: Path to input CSV file
+        output_path: Path for output file (Parquet if it ends in .parquet, else CSV),
+            or None to skip writing
+        config: Data source configuration dict
+        day_start_hour: Hour that starts each "day" (default: 7am)
+        bucket_minutes: Size of time buckets in minutes (default: 5)
+
+    Returns:
+        DataFrame with bucketed data
+    """
+    data = bucket_data(input_path, config, day_start_hour, bucket_minutes)
+    buckets_df = data.to_dataframe()
+
+    # Save
+    if output_path is not None:
+        write_buckets(buckets_df, output_path)
+    print(f"Shape: {buckets_df.shape}")
+
+    print_summary(data)
+
     return buckets_df
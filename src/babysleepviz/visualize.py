@@ -5,13 +5,15 @@ This module reads time-bucketed data and creates a layered visualization
 showing patterns over time.
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+from .parse_data import BucketedData
+
 try:
     import yaml
 
@@ -25,21 +27,120 @@ def load_config(config_path: Path) -> dict:
     if not HAS_YAML:
         print("Warning: PyYAML not installed, using default configuration")
         return {}
+    # The libyaml-backed loader is much faster when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     with open(config_path) as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=loader)
 
 
-def hex_to_rgba(hex_color: str, alpha: float = 1.0) -> np.ndarray:
-    """Convert hex color to RGBA numpy array."""
-    hex_color = hex_color.lstrip("#")
-    r = int(hex_color[0:2], 16) / 255
-    g = int(hex_color[2:4], 16) / 255
-    b = int(hex_color[4:6], 16) / 255
-    return np.array([r, g, b, alpha])
+# Maps each ASCII byte to its hex digit value, or -1 if it isn't a hex digit
+_HEX_LUT = np.full(256, -1, dtype=np.int16)
+_HEX_LUT[ord("0") : ord("9") + 1] = np.arange(10)
+_HEX_LUT[ord("a") : ord("f") + 1] = np.arange(10, 16)
+_HEX_LUT[ord("A") : ord("F") + 1] = np.arange(10, 16)
 
 
-def get_age_label(month_num: int) -> str:
-    """Convert month number to age label like 'Born', '1 mo', '1 yr 2 mo', etc."""
+def _decode_hex_numpy(digits: np.ndarray, alpha: float, out: np.ndarray) -> int:
+    """
+    Decode (N, 6) ASCII hex digit bytes into out (N, 4) as 0-1 RGBA.
+
+    Returns the index of the first row with a non-hex digit, or -1 if all are valid.
+    """
+    nibbles = _HEX_LUT[digits]
+    bad_rows = np.flatnonzero((nibbles < 0).any(axis=1))
+    if len(bad_rows):
+        return int(bad_rows[0])
+    out[:, :3] = (nibbles[:, 0::2] * 16 + nibbles[:, 1::2]) / 255
+    out[:, 3] = alpha
+    return -1
+
+
+# Numba is optional; it's only needed for the compiled kernels below
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+
+    @njit(cache=True)
+    def _decode_hex(digits, alpha, out):
+        """Compiled _decode_hex_numpy using branchless nibble arithmetic on the digit bytes."""
+        for i in range(digits.shape[0]):
+            for j in range(6):
+                c = digits[i, j]
+                if not (48 <= c <= 57 or 65 <= c <= 70 or 97 <= c <= 102):
+                    return i
+            for j in range(3):
+                hi = digits[i, 2 * j]
+                lo = digits[i, 2 * j + 1]
+                # '0'-'9' have bit 6 clear; 'A'-'F' and 'a'-'f' have it set and low nibble 1-6
+                value = ((hi & 0xF) + 9 * (hi >> 6)) * 16 + (lo & 0xF) + 9 * (lo >> 6)
+                out[i, j] = value / 255
+            out[i, 3] = alpha
+        return -1
+
+else:
+    _decode_hex = _decode_hex_numpy
+
+
+def hex_to_rgba_array(hex_colors, alpha: float = 1.0, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Convert a sequence of hex colors to an (N, 4) RGBA numpy array in one pass.
+
+    If out is given, the colors are written into it and it is returned.
+    """
+    hex_colors = list(hex_colors)
+    digits = [hex_color.lstrip("#")[:6] for hex_color in hex_colors]
+    for hex_color, d in zip(hex_colors, digits):
+        if len(d) < 6:
+            raise ValueError(f"Invalid hex color: {hex_color!r}")
+    raw = np.frombuffer("".join(digits).encode("ascii"), dtype=np.uint8).reshape(-1, 6)
+    if out is None:
+        out = np.empty((len(digits), 4))
+    elif out.shape != (len(digits), 4) or out.dtype.kind != "f":
+        # The compiled kernel doesn't bounds-check, so a mismatched buffer must not reach it
+        raise ValueError(
+            f"out must be a float array of shape {(len(digits), 4)}, "
+            f"got {out.dtype} array of shape {out.shape}"
+        )
+    bad = _decode_hex(raw, float(alpha), out)
+    if bad >= 0:
+        raise ValueError(f"Invalid hex color: {hex_colors[bad]!r}")
+    return out
+
+
+@lru_cache(maxsize=64)
+def _hex_to_rgba_cached(hex_color: str, alpha: float) -> np.ndarray:
+    """Read-only RGBA array for one color, cached per (color, alpha)."""
+    rgba = hex_to_rgba_array([hex_color], alpha)[0]
+    rgba.setflags(write=False)
+    return rgba
+
+
+def hex_to_rgba(hex_color: str, alpha: float = 1.0, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Convert hex color to RGBA numpy array.
+
+    Results are cached per (color, alpha), so the returned array is read-only.
+    Pass a length-4 out array to get the color written into it instead.
+    """
+    if out is None:
+        return _hex_to_rgba_cached(hex_color, alpha)
+    # As a (1, 4) view, out gets the same shape and dtype checks as a palette buffer
+    hex_to_rgba_array([hex_color], alpha, out=out[None])
+    return out
+
+
+def rgba_to_uint8(rgba: np.ndarray) -> np.ndarray:
+    """Convert a 0-1 float RGBA color to 0-255 uint8, truncating the way matplotlib does."""
+    return (np.asarray(rgba) * 255).astype(np.uint8)
+
+
+def _compute_age_label(month_num: int) -> str:
+    """Format an age label for get_age_label."""
     if month_num == 0:
         return "Born"
     years = month_num // 12
@@ -52,6 +153,97 @@ def get_age_label(month_num: int) -> str:
         return f"{years} yr {months} mo"
 
 
+# Labels for the first four years, which covers any realistic chart
+_AGE_LABELS = tuple(_compute_age_label(m) for m in range(48))
+
+
+def get_age_label(month_num: int) -> str:
+    """Convert month number to age label like 'Born', '1 mo', '1 yr 2 mo', etc."""
+    if 0 <= month_num < len(_AGE_LABELS):
+        return _AGE_LABELS[month_num]
+    return _compute_age_label(month_num)
+
+
+def get_age_labels(month_nums) -> np.ndarray:
+    """Vectorized get_age_label: convert an array of month numbers to an object array of labels."""
+    month_nums = np.asarray(month_nums, dtype=np.int64)
+    years = month_nums // 12
+    months = month_nums % 12
+    years_label = np.char.add(years.astype(str), " yr")
+    months_label = np.char.add(months.astype(str), " mo")
+    both_label = np.char.add(np.char.add(years_label, " "), months_label)
+    labels = np.where(years == 0, months_label, np.where(months == 0, years_label, both_label))
+    return np.where(month_nums == 0, "Born", labels).astype(object)
+
+
+def _paint_lanes_numpy(
+    asleep: np.ndarray,
+    feed: np.ndarray,
+    meds: np.ndarray,
+    sleep_color: np.ndarray,
+    feed_color: np.ndarray,
+    med_colors: np.ndarray,
+    col_offsets: np.ndarray,
+    day_width: int,
+    image: np.ndarray,
+) -> None:
+    """
+    Paint sleep, then feed, then each medication (checkerboard) into the day lanes.
+
+    asleep and feed are (rows, days) flag matrices, meds is (meds, rows, days) with
+    med_colors (meds, 4); day d covers image columns col_offsets[d] onward.
+    """
+    rows, total_cols = image.shape[:2]
+
+    # Map each image column to the day drawn in it (-1 for gaps), then paint each
+    # layer over every day at once
+    col_day = np.full(total_cols, -1)
+    for c in range(day_width):
+        cols = col_offsets + c
+        in_image = cols < total_cols
+        col_day[cols[in_image]] = np.flatnonzero(in_image)
+    lane_cols = np.flatnonzero(col_day >= 0)
+    lane_days = col_day[lane_cols]
+
+    def paint(mask: np.ndarray, color: np.ndarray) -> None:
+        row_idx, lane_idx = np.nonzero(mask)
+        image[row_idx, lane_cols[lane_idx]] = color
+
+    paint(asleep[:, lane_days] == 1, sleep_color)
+    paint(feed[:, lane_days] == 1, feed_color)
+
+    # One parity mask shared by every med
+    checkerboard = (np.arange(rows)[:, None] + lane_cols[None, :]) % 2 == 0
+    med_hits = (meds[:, :, lane_days] == 1) & checkerboard
+    for hits, color in zip(med_hits, med_colors):
+        paint(hits, color)
+
+
+if HAS_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def _paint_lanes(
+        asleep, feed, meds, sleep_color, feed_color, med_colors, col_offsets, day_width, image
+    ):
+        """Compiled _paint_lanes_numpy: days write disjoint columns, so they run in parallel."""
+        rows, total_cols = image.shape[0], image.shape[1]
+        for d in prange(asleep.shape[1]):
+            col_end = min(col_offsets[d] + day_width, total_cols)
+            for r in range(rows):
+                for c in range(col_offsets[d], col_end):
+                    if asleep[r, d] == 1:
+                        image[r, c, :] = sleep_color
+                    if feed[r, d] == 1:
+                        image[r, c, :] = feed_color
+                    if (r + c) % 2 == 0:
+                        for k in range(meds.shape[0]):
+                            if meds[k, r, d] == 1:
+                                image[r, c, :] = med_colors[k]
+
+else:
+    _paint_lanes = _paint_lanes_numpy
+
+
 # Default medication colors
 DEFAULT_MED_COLORS = {
     "Tylenol": "#FF0080",
@@ -66,7 +258,7 @@ DEFAULT_MED_COLORS = {
 
 
 def create_visualization(
-    input_path: Path,
+    input_path: Path | None,
     output_path: Path,
     config: dict,
     day_zero: datetime,
@@ -74,12 +266,13 @@ def create_visualization(
     max_months: int = 24,
     day_start_hour: int = 7,
     bucket_minutes: int = 5,
+    input_df: pd.DataFrame | None = None,
 ) -> None:
     """
     Create heatmap visualization from bucketed data.
 
     Args:
-        input_path: Path to bucketed CSV file
+        input_path: Path to bucketed CSV or .parquet file (ignored when input_df is given)
         output_path: Path for output PNG file
         config: Visualization configuration dict
         day_zero: The start date for day 0
@@ -87,17 +280,62 @@ def create_visualization(
         max_months: Maximum months to display
         day_start_hour: Hour that starts each "day"
         bucket_minutes: Size of time buckets in minutes
+        input_df: Bucketed data already in memory, as returned by parse_data
     """
+    # Read the data
+    if input_df is not None:
+        df = input_df
+    elif Path(input_path).suffix == ".parquet":
+        df = pd.read_parquet(input_path)
+    else:
+        df = pd.read_csv(input_path)
+
+    create_visualization_from_arrays(
+        BucketedData.from_dataframe(df, day_start_hour, bucket_minutes),
+        output_path=output_path,
+        config=config,
+        day_zero=day_zero,
+        birthday_day=birthday_day,
+        max_months=max_months,
+    )
+
+
+def create_visualization_from_arrays(
+    data: BucketedData,
+    output_path: Path,
+    config: dict,
+    day_zero: datetime,
+    birthday_day: int = 8,
+    max_months: int = 24,
+) -> None:
+    """
+    Create heatmap visualization from bucketed flag matrices, skipping any file I/O.
+
+    Args:
+        data: Bucketed data, as returned by bucket_data
+        output_path: Path for output PNG file
+        config: Visualization configuration dict
+        day_zero: The start date for day 0
+        birthday_day: Day of month for birthday (for month boundary alignment)
+        max_months: Maximum months to display
+    """
+    # pyplot takes about half a second to import, so only pay for it when rendering
+    import matplotlib.pyplot as plt
+
+    day_start_hour = data.day_start_hour
+    bucket_minutes = data.bucket_minutes
+
     # Load config colors
     viz_config = config.get("visualization", {})
     colors_config = viz_config.get("colors", {})
     med_colors_config = colors_config.get("medications", {})
 
     # Default colors
-    SLEEP_COLOR = hex_to_rgba(colors_config.get("sleep", "#3DD2E6"))
-    FEED_COLOR = hex_to_rgba(colors_config.get("feed", "#D5622F"))
-    BG_COLOR = np.array([0.0, 0.0, 0.0, 0.0])
-    SEPARATOR_COLOR = hex_to_rgba(colors_config.get("separator", "#9B59B6"))
+    # The canvas is uint8 RGBA, so colors are converted once up front
+    SLEEP_COLOR = rgba_to_uint8(hex_to_rgba(colors_config.get("sleep", "#3DD2E6")))
+    FEED_COLOR = rgba_to_uint8(hex_to_rgba(colors_config.get("feed", "#D5622F")))
+    BG_COLOR = np.zeros(4, dtype=np.uint8)
+    SEPARATOR_COLOR = rgba_to_uint8(hex_to_rgba(colors_config.get("separator", "#9B59B6")))
 
     MED_TYPES = config.get(
         "medication_types",
@@ -115,48 +353,42 @@ def create_visualization(
     if "Other" not in MED_TYPES:
         MED_TYPES = MED_TYPES + ["Other"]
 
-    MED_COLORS = {}
-    for med_type in MED_TYPES:
-        hex_color = med_colors_config.get(med_type, DEFAULT_MED_COLORS.get(med_type, "#FFFFFF"))
-        MED_COLORS[med_type] = hex_to_rgba(hex_color)
-
-    # Read the data
-    df = pd.read_csv(input_path)
+    # One row per entry of MED_TYPES
+    MED_COLORS = rgba_to_uint8(
+        hex_to_rgba_array(
+            [
+                med_colors_config.get(med_type, DEFAULT_MED_COLORS.get(med_type, "#FFFFFF"))
+                for med_type in MED_TYPES
+            ]
+        )
+    )
 
     # Get dimensions
-    num_days = df["day"].nunique()
-    minutes_per_day = df["minute_of_day"].nunique()
+    num_days = data.num_days
+    minutes_per_day = data.buckets_per_day
 
     print(f"Number of days: {num_days}")
     print(f"Expected rows per day (buckets): {minutes_per_day}")
 
-    # Pivot to get matrices
-    asleep_matrix = df.pivot(index="minute_of_day", columns="day", values="asleep").values
-    feed_matrix = df.pivot(index="minute_of_day", columns="day", values="feed").values
+    asleep_matrix = data.asleep
+    feed_matrix = data.feed
 
     # Individual medication matrices
     med_matrices = {}
     for med_type in MED_TYPES:
-        col_name = f"med_{med_type}"
-        if col_name in df.columns:
-            med_matrices[med_type] = df.pivot(
-                index="minute_of_day", columns="day", values=col_name
-            ).values
+        if med_type in data.meds:
+            med_matrices[med_type] = data.meds[med_type]
         else:
             med_matrices[med_type] = np.zeros((minutes_per_day, num_days))
 
     # Calculate month boundaries based on birthday
     # Skip day 0 since we already have "Born" label there
-    month_boundaries = []
-    current_boundary = None
-    for day_idx in range(num_days):
-        day_date = day_zero + timedelta(days=day_idx)
-        if day_date.day == birthday_day:
-            month_key = (day_date.year, day_date.month)
-            if current_boundary != month_key:
-                if day_idx > 0:  # Skip day 0 - "Born" is already there
-                    month_boundaries.append(day_idx)
-                current_boundary = month_key
+    # A day of the month occurs at most once per calendar month, so every match
+    # is already a distinct month
+    dates = np.datetime64(day_zero.date(), "D") + np.arange(num_days)
+    day_of_month = (dates - dates.astype("datetime64[M]")).astype(np.int64) + 1
+    month_boundaries = np.flatnonzero(day_of_month == birthday_day)
+    month_boundaries = month_boundaries[month_boundaries > 0].tolist()
 
     print(f"Number of month boundaries (birthday-aligned): {len(month_boundaries)}")
 
@@ -193,15 +425,14 @@ def create_visualization(
     print(f"Total columns (with separators): {total_cols}")
 
     # Initialize image
-    image = np.zeros((rows, total_cols, 4), dtype=np.float32)
+    image = np.zeros((rows, total_cols, 4), dtype=np.uint8)
     image[:, :] = BG_COLOR
 
-    def get_col_offset(day_idx):
-        """Get the starting column for a given day."""
-        separators_before = sum(1 for b in month_boundaries if b <= day_idx)
-        base_col = day_idx * (day_width + day_padding)
-        extra_from_separators = separators_before * (separator_width - day_padding)
-        return base_col + extra_from_separators
+    # Starting column of each day, shifted right by every separator at or before it
+    day_indices = np.arange(num_days)
+    separators_before = np.searchsorted(np.asarray(month_boundaries), day_indices, side="right")
+    col_offsets = day_indices * (day_width + day_padding)
+    col_offsets += separators_before * (separator_width - day_padding)
 
     # Time markers (relative to day start hour)
     hours_to_9am = (9 - day_start_hour) % 24
@@ -212,12 +443,10 @@ def create_visualization(
     WORK_HOURS_END_ROW = (hours_to_5pm * 60) // bucket_minutes
     MIDNIGHT_ROW = (hours_to_midnight * 60) // bucket_minutes
 
-    WORK_HOURS_COLOR = hex_to_rgba(colors_config.get("work_hours", "#9B59B6"), 0.15)
+    WORK_HOURS_COLOR = rgba_to_uint8(hex_to_rgba(colors_config.get("work_hours", "#9B59B6"), 0.15))
 
     # Apply work hours background
-    for row in range(WORK_HOURS_START_ROW, WORK_HOURS_END_ROW):
-        for col in range(total_cols):
-            image[row, col] = WORK_HOURS_COLOR
+    image[WORK_HOURS_START_ROW:WORK_HOURS_END_ROW] = WORK_HOURS_COLOR
 
     print(f"Highlighted 9am-5pm (rows {WORK_HOURS_START_ROW} to {WORK_HOURS_END_ROW})")
 
@@ -226,7 +455,7 @@ def create_visualization(
     row_end_sep = int(rows * 0.75)
 
     for boundary_day in month_boundaries:
-        day_col = get_col_offset(boundary_day)
+        day_col = col_offsets[boundary_day]
         line_col = day_col - separator_width // 2
         if 0 <= line_col < total_cols:
             for row in range(row_start_sep, row_end_sep):
@@ -234,53 +463,36 @@ def create_visualization(
                 if line_col + 1 < total_cols:
                     image[row, line_col + 1] = SEPARATOR_COLOR
 
-    # Fill data lanes
-    for day_idx in range(num_days):
-        col_offset = get_col_offset(day_idx)
-        col_start = col_offset
-        col_end = col_offset + day_width
-
-        # Layer 1: Sleep
-        for row_idx in range(rows):
-            if asleep_matrix[row_idx, day_idx] == 1:
-                for c in range(col_start, min(col_end, total_cols)):
-                    image[row_idx, c] = SLEEP_COLOR
-
-        # Layer 2: Feed
-        for row_idx in range(rows):
-            if feed_matrix[row_idx, day_idx] == 1:
-                for c in range(col_start, min(col_end, total_cols)):
-                    image[row_idx, c] = FEED_COLOR
-
-        # Layer 3: Medications (checkerboard pattern)
-        for med_type in MED_TYPES:
-            med_matrix = med_matrices[med_type]
-            med_color = MED_COLORS[med_type]
-            for row_idx in range(rows):
-                if med_matrix[row_idx, day_idx] == 1:
-                    for c in range(col_start, min(col_end, total_cols)):
-                        if (row_idx + c) % 2 == 0:
-                            image[row_idx, c] = med_color
+    # Fill data lanes: sleep, then feed, then medications (checkerboard pattern)
+    _paint_lanes(
+        asleep_matrix,
+        feed_matrix,
+        np.stack([med_matrices[med_type] for med_type in MED_TYPES]),
+        SLEEP_COLOR,
+        FEED_COLOR,
+        MED_COLORS,
+        col_offsets,
+        day_width,
+        image,
+    )
 
     # Midnight highlight overlay
     MIDNIGHT_OVERLAY_COLOR = np.array([1.0, 1.0, 1.0, 0.35])
 
-    for row in range(MIDNIGHT_ROW - 1, MIDNIGHT_ROW + 2):
-        if 0 <= row < rows:
-            for col in range(total_cols):
-                base = image[row, col]
-                alpha = MIDNIGHT_OVERLAY_COLOR[3]
-                blended_rgb = base[:3] * (1 - alpha) + MIDNIGHT_OVERLAY_COLOR[:3] * alpha
-                image[row, col, :3] = blended_rgb
+    # Blend in 0-1 floats (only three rows) so values truncate exactly as before
+    band = image[max(0, MIDNIGHT_ROW - 1) : MIDNIGHT_ROW + 2, :, :3]
+    alpha = MIDNIGHT_OVERLAY_COLOR[3]
+    blended = (band / 255).astype(np.float32) * (1 - alpha) + MIDNIGHT_OVERLAY_COLOR[:3] * alpha
+    band[...] = rgba_to_uint8(blended.astype(np.float32))
 
     print(f"Highlighted midnight (row {MIDNIGHT_ROW}) on top of data")
     print(f"Final image shape: {image.shape} (rows, cols, RGBA)")
 
     # Generate section labels
-    section_info = [(get_col_offset(0), get_age_label(0))]
-    for i, boundary_day in enumerate(month_boundaries):
-        separator_col = get_col_offset(boundary_day) - separator_width // 2
-        section_info.append((separator_col, get_age_label(i + 1)))
+    section_cols = [col_offsets[0]] + [
+        col_offsets[boundary_day] - separator_width // 2 for boundary_day in month_boundaries
+    ]
+    section_info = list(zip(section_cols, get_age_labels(np.arange(len(section_cols)))))
 
     print(f"Generated {len(section_info)} section labels")
 
@@ -417,8 +629,10 @@ def create_visualization(
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    plt.savefig(output_path, dpi=300, bbox_inches="tight", pad_inches=0.02, transparent=True)
-    plt.close()
+    # Save through the figure rather than pyplot, which redraws the whole figure (and
+    # resamples the heatmap image again) after writing the file
+    fig.savefig(output_path, dpi=300, bbox_inches="tight", pad_inches=0.02, transparent=True)
+    plt.close(fig)
 
     print(f"\nSaved to: {output_path}")
     print(f"\nMonth boundaries at days: {month_boundaries[:12]}... (showing first 12)")
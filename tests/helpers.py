@@ -0,0 +1,8 @@
+"""Shared test helpers."""
+
+import pytest
+
+from babysleepviz.parse_data import HAS_NUMBA
+
+# Without Numba the compiled kernels are their NumPy versions, so comparing them is vacuous
+requires_numba = pytest.mark.skipif(not HAS_NUMBA, reason="Numba not installed")
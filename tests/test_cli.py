@@ -0,0 +1,40 @@
+"""Tests for cli module."""
+
+from datetime import datetime
+
+import pytest
+
+from babysleepviz.cli import _parse_ymd
+
+
+class TestParseYmd:
+    """Tests for _parse_ymd function."""
+
+    @pytest.mark.parametrize(
+        "s, expected",
+        [
+            ("2024-01-15", datetime(2024, 1, 15)),
+            ("2024-02-29", datetime(2024, 2, 29)),
+            ("0999-12-31", datetime(999, 12, 31)),
+        ],
+    )
+    def test_valid_dates(self, s, expected):
+        """Well-formed dates parse to midnight on that day."""
+        assert _parse_ymd(s) == expected
+
+    @pytest.mark.parametrize(
+        "s",
+        ["", "2024-1-15", "2024/01/15", "20240115", "2024-01-15T00", "2024-13-01", "2023-02-29"],
+    )
+    def test_malformed_input(self, s):
+        """Wrong length, separators or out-of-range fields raise ValueError."""
+        with pytest.raises(ValueError, match="expected YYYY-MM-DD"):
+            _parse_ymd(s)
+
+    @pytest.mark.parametrize(
+        "s", ["2024-+1-+5", "2024- 1- 5", "+024-01-15", "-024-01-15", "2024-01-1١", "２024-01-15"]
+    )
+    def test_signs_spaces_and_non_ascii_digits(self, s):
+        """Fields must be ASCII digits, even where int() would accept them."""
+        with pytest.raises(ValueError, match="expected YYYY-MM-DD"):
+            _parse_ymd(s)
@@ -0,0 +1,86 @@
+"""Tests for the sample data generator script."""
+
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+SCRIPT_PATH = SCRIPTS_DIR / "generate_sample_data.py"
+
+# scripts/ isn't a package, so load the generator straight from its file. It must be in
+# sys.modules under its own name: Numba's on-disk cache records the module name and
+# re-imports it when loading cached kernels.
+_spec = importlib.util.spec_from_file_location("generate_sample_data", SCRIPT_PATH)
+generate_sample_data = importlib.util.module_from_spec(_spec)
+sys.modules["generate_sample_data"] = generate_sample_data
+_spec.loader.exec_module(generate_sample_data)
+Events = generate_sample_data.Events
+
+NUM_DAYS = 200
+SEED = 7
+
+
+def as_array(events: Events) -> np.ndarray:
+    """Stack every field of Events into one (fields, records) array for comparison."""
+    return np.stack([events.event_type, events.start, events.duration, events.code, events.amount])
+
+
+def generate_all(days_per_chunk: int, monkeypatch) -> Events:
+    """All records from generate_newest_first with the given chunk size, in yield order."""
+    monkeypatch.setattr(generate_sample_data, "DAYS_PER_CHUNK", days_per_chunk)
+    chunks = list(generate_sample_data.generate_newest_first(NUM_DAYS, SEED))
+    return Events.concat(chunks)
+
+
+class TestGenerateNewestFirst:
+    """Tests for generate_newest_first function."""
+
+    @pytest.mark.parametrize("days_per_chunk", [1, 7, 90])
+    def test_newest_first_across_chunks(self, days_per_chunk, monkeypatch):
+        """Start times never increase, including where one chunk hands over to the next."""
+        events = generate_all(days_per_chunk, monkeypatch)
+        assert len(events) > 0
+        assert (np.diff(events.start) <= 0).all()
+
+    def test_chunk_size_does_not_change_records(self, monkeypatch):
+        """Every chunk size yields the same records in the same order."""
+        expected = as_array(generate_all(1, monkeypatch))
+        for days_per_chunk in [7, 90]:
+            np.testing.assert_array_equal(
+                as_array(generate_all(days_per_chunk, monkeypatch)), expected
+            )
+
+    def test_matches_reversed_generate_days(self, monkeypatch):
+        """The output is generate_days over the whole range, sorted newest first."""
+        events = generate_sample_data.generate_days(0, NUM_DAYS, SEED)
+        expected = events.take(np.argsort(-events.start, kind="stable"))
+        np.testing.assert_array_equal(as_array(generate_all(7, monkeypatch)), as_array(expected))
+
+
+class TestMain:
+    """Tests for the generator's command line entry point."""
+
+    def run_script(self, output_path: Path, hide: str | None = None) -> bytes:
+        """Run the script for a short range and return the CSV it wrote."""
+        args = ["--days", "20", "--seed", str(SEED), "--output", str(output_path)]
+        hide_module = f"sys.modules[{hide!r}] = None\n" if hide else ""
+        code = (
+            f"import runpy, sys\n{hide_module}"
+            # As when run directly, scripts/ is first on the path
+            f"sys.path.insert(0, {str(SCRIPTS_DIR)!r})\n"
+            f"sys.argv = [{str(SCRIPT_PATH)!r}] + {args!r}\n"
+            f"runpy.run_path({str(SCRIPT_PATH)!r}, run_name='__main__')\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        return output_path.read_bytes()
+
+    @pytest.mark.parametrize("hide", ["numba", "pyarrow"])
+    def test_output_without_optional_dependency(self, hide, tmp_path):
+        """The CSV is byte-identical with and without each optional speedup."""
+        expected = self.run_script(tmp_path / "full.csv")
+        assert self.run_script(tmp_path / f"no_{hide}.csv", hide=hide) == expected
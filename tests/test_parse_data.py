@@ -1,15 +1,28 @@
 """Tests for parse_data module."""
 
+import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import pytest
 
-# Add src to path for testing without install
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from babysleepviz.parse_data import (
+    BucketedData,
+    _mark_sleep_buckets,
+    _mark_sleep_buckets_numpy,
+    bucket_data,
+    get_day_boundaries,
+    get_day_boundary,
+    get_minute_of_day,
+    get_minutes_of_day,
+    normalize_med_name,
+    normalize_med_names,
+)
 
-from babysleepviz.parse_data import get_day_boundary, get_minute_of_day, normalize_med_name
+from .helpers import requires_numba
 
 
 class TestGetDayBoundary:
@@ -94,6 +107,73 @@ class TestGetMinuteOfDay:
         assert result == 2 * 60 + 30  # 150
 
 
+class TestGetDayBoundaries:
+    """Tests for get_day_boundaries function."""
+
+    def test_matches_scalar_version(self):
+        """Each boundary matches get_day_boundary for the same timestamp."""
+        timestamps = [
+            datetime(2024, 1, 15, 9, 30, 0),
+            datetime(2024, 1, 15, 5, 30, 0),
+            datetime(2024, 1, 15, 7, 0, 0),
+            datetime(2024, 1, 15, 0, 0, 0),
+            datetime(2024, 1, 1, 3, 0, 0),
+        ]
+        result = get_day_boundaries(pd.Series(pd.to_datetime(timestamps)), day_start_hour=7)
+        assert list(result) == [get_day_boundary(ts, day_start_hour=7) for ts in timestamps]
+
+    def test_custom_day_start(self):
+        """Custom day start hour works correctly."""
+        ts = pd.Series(pd.to_datetime(["2024-01-15 08:30", "2024-01-15 09:00"]))
+        result = get_day_boundaries(ts, day_start_hour=9)
+        assert list(result) == [datetime(2024, 1, 14, 9, 0, 0), datetime(2024, 1, 15, 9, 0, 0)]
+
+
+class TestGetMinutesOfDay:
+    """Tests for get_minutes_of_day function."""
+
+    def test_matches_scalar_version(self):
+        """Each minute matches get_minute_of_day for the same timestamp."""
+        timestamps = [
+            datetime(2024, 1, 15, 7, 0, 0),
+            datetime(2024, 1, 15, 8, 0, 0),
+            datetime(2024, 1, 15, 0, 0, 0),
+            datetime(2024, 1, 15, 6, 55, 0),
+            datetime(2024, 1, 15, 9, 30, 0),
+        ]
+        result = get_minutes_of_day(pd.Series(pd.to_datetime(timestamps)), day_start_hour=7)
+        assert list(result) == [get_minute_of_day(ts, day_start_hour=7) for ts in timestamps]
+
+    def test_ignores_seconds(self):
+        """Seconds past the minute are dropped, not rounded."""
+        ts = pd.Series(pd.to_datetime(["2024-01-15 07:04:59"]))
+        assert list(get_minutes_of_day(ts, day_start_hour=7)) == [4]
+
+
+class TestMarkSleepBuckets:
+    """Tests for the sleep bucket marking kernel."""
+
+    @requires_numba
+    @pytest.mark.parametrize("bucket_minutes", [5, 7, 15])
+    def test_matches_numpy_version(self, bucket_minutes):
+        """The compiled kernel marks the same buckets as the NumPy implementation."""
+        rng = np.random.default_rng(0)
+        start_min = rng.integers(-600, 10 * 1440, size=200)
+        end_min = start_min + rng.integers(1, 900, size=200)
+        buckets_per_day = len(range(0, 24 * 60, bucket_minutes))
+        expected = np.zeros(10 * buckets_per_day, dtype=np.int8)
+        _mark_sleep_buckets_numpy(start_min, end_min, bucket_minutes, 10, expected)
+        result = np.zeros_like(expected)
+        _mark_sleep_buckets(start_min, end_min, bucket_minutes, 10, result)
+        np.testing.assert_array_equal(result, expected)
+
+    def test_marks_partial_buckets(self):
+        """Every bucket started before the end of the interval is marked."""
+        result = np.zeros(288, dtype=np.int8)
+        _mark_sleep_buckets(np.array([10]), np.array([21]), 5, 1, result)
+        assert list(np.flatnonzero(result)) == [2, 3, 4]
+
+
 class TestNormalizeMedName:
     """Tests for normalize_med_name function."""
 
@@ -132,6 +212,133 @@ class TestNormalizeMedName:
         assert normalize_med_name("  Tylenol  ", known_meds) == "Tylenol"
 
 
+class TestNormalizeMedNames:
+    """Tests for normalize_med_names function."""
+
+    def test_matches_scalar_version(self):
+        """Each name is normalized the same way as normalize_med_name."""
+        known_meds = ["Tylenol", "Motrin", "Vitamin D"]
+        names = [
+            "Tylenol",
+            "Vitamin D",
+            "SomethingElse",
+            "tylenol",
+            "Tylenol 5ml",
+            "Ibuprofen 100mg",
+            "motrin",
+            None,
+            "  Vitamin D  ",
+        ]
+        result = normalize_med_names(pd.Series(names, dtype=object), known_meds)
+        assert list(result) == [normalize_med_name(name, known_meds) for name in names]
+
+    def test_keeps_index(self):
+        """Result lines up with the input Series."""
+        names = pd.Series(["Tylenol", "Other thing"], index=[10, 20])
+        result = normalize_med_names(names, ["Tylenol"])
+        assert list(result.index) == [10, 20]
+
+
+class TestBucketedData:
+    """Tests for BucketedData conversions."""
+
+    @pytest.fixture
+    def data(self):
+        """Three days of 6-hour buckets with a few flags set."""
+        asleep = np.zeros((4, 3), dtype=np.int8)
+        asleep[0, 0] = asleep[3, 2] = 1
+        feed = np.zeros((4, 3), dtype=np.int8)
+        feed[1, 1] = 1
+        tylenol = np.zeros((4, 3), dtype=np.int8)
+        tylenol[2, 0] = 1
+        return BucketedData(asleep, feed, {"Tylenol": tylenol}, bucket_minutes=360)
+
+    def test_to_dataframe_layout(self, data):
+        """Rows run day by day, bucket by bucket, with one column per flag."""
+        df = data.to_dataframe()
+        assert list(df.columns) == ["day", "minute_of_day", "asleep", "feed", "med_Tylenol"]
+        assert list(df["day"]) == [0] * 4 + [1] * 4 + [2] * 4
+        assert list(df["minute_of_day"]) == [0, 360, 720, 1080] * 3
+        assert list(df["asleep"]) == [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1]
+        assert list(df["med_Tylenol"]) == [0, 0, 1, 0] + [0] * 8
+
+    def test_round_trip(self, data):
+        """from_dataframe rebuilds the same matrices, even from shuffled rows."""
+        df = data.to_dataframe().sample(frac=1, random_state=0)
+        result = BucketedData.from_dataframe(df, bucket_minutes=360)
+        np.testing.assert_array_equal(result.asleep, data.asleep)
+        np.testing.assert_array_equal(result.feed, data.feed)
+        assert list(result.meds) == ["Tylenol"]
+        np.testing.assert_array_equal(result.meds["Tylenol"], data.meds["Tylenol"])
+
+
+class TestBucketData:
+    """Tests for bucket_data function."""
+
+    CONFIG = {
+        "columns": {"type": "Type", "start": "Start", "end": "End"},
+        "event_types": {"sleep": "sleep", "feed": "feed", "meds": "meds"},
+        "med_name_column": "Start Location",
+        "medication_types": ["Tylenol"],
+    }
+
+    def test_non_iso_timestamps(self, tmp_path):
+        """Timestamps in another app's format bucket the same as ISO ones."""
+        rows = [
+            ("sleep", "2024-07-19 01:26", "2024-07-19 03:05", ""),
+            ("feed", "2024-07-19 10:40", "", ""),
+            ("meds", "2024-07-20 20:15", "", "Tylenol"),
+        ]
+        iso_path = tmp_path / "iso.csv"
+        us_path = tmp_path / "us.csv"
+        df = pd.DataFrame(rows, columns=["Type", "Start", "End", "Start Location"])
+        df.to_csv(iso_path, index=False)
+        for col in ["Start", "End"]:
+            df[col] = pd.to_datetime(df[col]).dt.strftime("%m/%d/%Y %I:%M %p")
+        df.to_csv(us_path, index=False)
+        assert "07/19/2024 01:26 AM" in us_path.read_text()
+
+        expected = bucket_data(iso_path, self.CONFIG)
+        result = bucket_data(us_path, self.CONFIG)
+        assert result.day_zero == expected.day_zero
+        np.testing.assert_array_equal(result.asleep, expected.asleep)
+        np.testing.assert_array_equal(result.feed, expected.feed)
+        np.testing.assert_array_equal(result.meds["Tylenol"], expected.meds["Tylenol"])
+        assert result.asleep.sum() > 0
+
+
+class TestPackageExports:
+    """Tests for the names exported by the babysleepviz package."""
+
+    def run_python(self, code: str) -> subprocess.CompletedProcess:
+        """Run code in a fresh interpreter, so import side effects start from scratch."""
+        src = str(Path(__file__).parent.parent / "src")
+        return subprocess.run(
+            [sys.executable, "-c", f"import sys; sys.path.insert(0, {src!r})\n{code}"],
+            capture_output=True,
+            text=True,
+        )
+
+    def test_parse_data_is_function_after_submodule_imports(self):
+        """babysleepviz.parse_data stays the function even after importing submodules."""
+        result = self.run_python(
+            "import babysleepviz.visualize, babysleepviz.cli, babysleepviz\n"
+            "from babysleepviz import parse_data\n"
+            "assert callable(babysleepviz.parse_data), babysleepviz.parse_data\n"
+            "assert callable(parse_data), parse_data\n"
+        )
+        assert result.returncode == 0, result.stderr
+
+    def test_cli_import_is_lazy(self):
+        """Importing the CLI doesn't load pandas, NumPy or Numba."""
+        result = self.run_python(
+            "import babysleepviz.cli\n"
+            "loaded = [m for m in ('pandas', 'numpy', 'numba') if m in sys.modules]\n"
+            "assert not loaded, loaded\n"
+        )
+        assert result.returncode == 0, result.stderr
+
+
 class TestIntegration:
     """Integration tests using sample data."""
 
@@ -146,8 +353,6 @@ class TestIntegration:
 
     def test_sample_data_has_required_columns(self, sample_data_path):
         """Sample data should have required columns."""
-        import pandas as pd
-
         if not sample_data_path.exists():
             pytest.skip("Sample data not available")
 
@@ -158,8 +363,6 @@ class TestIntegration:
 
     def test_sample_data_has_records(self, sample_data_path):
         """Sample data should have sleep, feed, and meds records."""
-        import pandas as pd
-
         if not sample_data_path.exists():
             pytest.skip("Sample data not available")
 
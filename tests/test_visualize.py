@@ -1,48 +1,60 @@
 """Tests for visualize module."""
 
-import sys
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
 import pytest
 
-# Add src to path for testing without install
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from babysleepviz.visualize import (
+    _decode_hex,
+    _decode_hex_numpy,
+    _paint_lanes,
+    _paint_lanes_numpy,
+    get_age_label,
+    get_age_labels,
+    hex_to_rgba,
+    hex_to_rgba_array,
+)
 
-from babysleepviz.visualize import get_age_label, hex_to_rgba
+from .helpers import requires_numba
+
+HEX_CASES = [
+    ("#FF0000", 1.0, [1.0, 0.0, 0.0, 1.0]),
+    ("#00FF00", 1.0, [0.0, 1.0, 0.0, 1.0]),
+    ("#0000FF", 1.0, [0.0, 0.0, 1.0, 1.0]),
+    ("#FF0000", 0.5, [1.0, 0.0, 0.0, 0.5]),
+    ("FF0000", 1.0, [1.0, 0.0, 0.0, 1.0]),
+]
 
 
 class TestHexToRgba:
     """Tests for hex_to_rgba function."""
 
-    def test_basic_colors(self):
-        """Basic color conversion works."""
-        # Red
-        result = hex_to_rgba("#FF0000")
-        expected = np.array([1.0, 0.0, 0.0, 1.0])
-        np.testing.assert_array_almost_equal(result, expected)
-
-        # Green
-        result = hex_to_rgba("#00FF00")
-        expected = np.array([0.0, 1.0, 0.0, 1.0])
-        np.testing.assert_array_almost_equal(result, expected)
-
-        # Blue
-        result = hex_to_rgba("#0000FF")
-        expected = np.array([0.0, 0.0, 1.0, 1.0])
-        np.testing.assert_array_almost_equal(result, expected)
-
-    def test_with_alpha(self):
-        """Alpha parameter works."""
-        result = hex_to_rgba("#FF0000", alpha=0.5)
-        expected = np.array([1.0, 0.0, 0.0, 0.5])
-        np.testing.assert_array_almost_equal(result, expected)
-
-    def test_without_hash(self):
-        """Works without leading hash."""
-        result = hex_to_rgba("FF0000")
-        expected = np.array([1.0, 0.0, 0.0, 1.0])
-        np.testing.assert_array_almost_equal(result, expected)
+    @pytest.mark.parametrize(
+        "hex_in, alpha, expected",
+        HEX_CASES,
+        ids=["red", "green", "blue", "alpha", "no-hash"],
+    )
+    def test_conversion(self, hex_in, alpha, expected):
+        """Primary colors, alpha and an unprefixed hex convert correctly."""
+        result = hex_to_rgba(hex_in, alpha)
+        np.testing.assert_array_almost_equal(result, np.asarray(expected, dtype=result.dtype))
+
+    def test_matches_int_reference(self):
+        """Any 6-digit hex, in either case, matches a plain int() parse."""
+        hypothesis = pytest.importorskip("hypothesis")
+        st = hypothesis.strategies
+
+        @hypothesis.given(st.text(alphabet="0123456789abcdefABCDEF", min_size=6, max_size=6))
+        def check(hex_in):
+            result = hex_to_rgba(hex_in)
+            value = int(hex_in, 16)
+            channels = [value >> 16 & 0xFF, value >> 8 & 0xFF, value & 0xFF, 255]
+            expected = np.asarray(channels, dtype=result.dtype) / 255
+            np.testing.assert_array_almost_equal(result, expected)
+
+        check()
 
     def test_sleep_color(self):
         """Huckleberry sleep color converts correctly."""
@@ -60,6 +72,72 @@ class TestHexToRgba:
         assert 0.1 < result[2] < 0.2  # B
         assert result[3] == 1.0  # A
 
+    def test_cached_result_is_read_only(self):
+        """Repeated calls share one cached array that can't be modified."""
+        result = hex_to_rgba("#3DD2E6")
+        assert hex_to_rgba("#3DD2E6") is result
+        assert not result.flags.writeable
+
+    def test_out_buffer(self):
+        """Passing out= fills and returns that same writable buffer."""
+        out = np.empty(4)
+        result = hex_to_rgba("#FF0000", alpha=0.5, out=out)
+        assert result is out
+        np.testing.assert_array_equal(out, [1.0, 0.0, 0.0, 0.5])
+
+    @pytest.mark.parametrize(
+        "out",
+        [np.zeros(4, dtype=np.uint8), np.zeros((3, 4)), np.zeros(3)],
+        ids=["int-dtype", "2d", "short"],
+    )
+    def test_mismatched_out_raises(self, out):
+        """An out buffer that isn't a float (4,) array raises instead of being written."""
+        with pytest.raises(ValueError):
+            hex_to_rgba("#3DD2E6", out=out)
+        assert not out.any()
+
+
+class TestHexToRgbaArray:
+    """Tests for hex_to_rgba_array function."""
+
+    @pytest.mark.parametrize("alpha", [1.0, 0.5])
+    def test_matches_scalar(self, alpha):
+        """The batch result equals the stacked single-color conversions."""
+        colors = [hex_in for hex_in, _, _ in HEX_CASES] + ["#3DD2E6", "D5622F", "#ff00aa"]
+        result = hex_to_rgba_array(colors, alpha)
+        expected = np.stack([hex_to_rgba(color, alpha) for color in colors])
+        np.testing.assert_array_equal(result, expected)
+
+    def test_invalid_color_raises(self):
+        """Short or non-hex colors raise ValueError."""
+        with pytest.raises(ValueError):
+            hex_to_rgba_array(["#FF0000", "#12345"])
+        with pytest.raises(ValueError):
+            hex_to_rgba_array(["#FF0000", "#GG0000"])
+
+    @pytest.mark.parametrize(
+        "out",
+        [np.zeros((2, 3)), np.zeros((1, 4)), np.zeros((3, 4)), np.zeros((2, 4), dtype=np.uint8)],
+        ids=["narrow", "short", "long", "int-dtype"],
+    )
+    def test_mismatched_out_raises(self, out):
+        """An out buffer of the wrong shape or dtype raises instead of being written."""
+        with pytest.raises(ValueError):
+            hex_to_rgba_array(["#FF0000", "#00FF00"], out=out)
+
+    @requires_numba
+    def test_kernel_matches_numpy_version(self):
+        """The compiled decode kernel matches the NumPy implementation, including bad rows."""
+        digits = np.frombuffer(b"0123456789abcdefABCDEF00", dtype=np.uint8).reshape(-1, 6)
+        expected = np.empty((len(digits), 4))
+        assert _decode_hex_numpy(digits, 0.5, expected) == -1
+        result = np.empty_like(expected)
+        assert _decode_hex(digits, 0.5, result) == -1
+        np.testing.assert_array_equal(result, expected)
+
+        bad = np.frombuffer(b"000000fffffg", dtype=np.uint8).reshape(-1, 6)
+        assert _decode_hex(bad, 1.0, np.empty((2, 4))) == 1
+
 
 class TestGetAgeLabel:
     """Tests for get_age_label function."""
@@ -95,40 +173,88 @@ class TestGetAgeLabel:
         assert get_age_label(30) == "2 yr 6 mo"
 
 
+class TestGetAgeLabels:
+    """Tests for get_age_labels function."""
+
+    def test_matches_scalar(self):
+        """Every label matches get_age_label for the same month."""
+        months = np.arange(36)
+        result = get_age_labels(months)
+        assert result.shape == months.shape
+        assert list(result) == [get_age_label(m) for m in months]
+
+    def test_empty(self):
+        """An empty input gives an empty label array."""
+        assert get_age_labels(np.arange(0)).shape == (0,)
+
+
+class TestPaintLanes:
+    """Tests for the data lane paint kernel."""
+
+    @requires_numba
+    def test_matches_numpy_version(self):
+        """The compiled kernel paints the same pixels as the NumPy implementation."""
+        rng = np.random.default_rng(0)
+        rows, num_days, day_width = 48, 20, 6
+        asleep = (rng.random((rows, num_days)) < 0.5).astype(np.int8)
+        feed = (rng.random((rows, num_days)) < 0.1).astype(np.int8)
+        meds = (rng.random((3, rows, num_days)) < 0.1).astype(np.int8)
+        colors = rng.integers(0, 256, size=(5, 4), dtype=np.uint8)
+        # Uneven gaps between days, and a last day cut off by the image edge
+        col_offsets = np.arange(num_days) * (day_width + 2) + np.repeat([0, 8], num_days // 2)
+        total_cols = col_offsets[-1] + day_width - 2
+
+        expected = np.zeros((rows, total_cols, 4), dtype=np.uint8)
+        args = (asleep, feed, meds, colors[0], colors[1], colors[2:], col_offsets, day_width)
+        _paint_lanes_numpy(*args, expected)
+        result = np.zeros_like(expected)
+        _paint_lanes(*args, result)
+        np.testing.assert_array_equal(result, expected)
+
+
 class TestVisualizationIntegration:
     """Integration tests for visualization."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def sample_buckets_path(self):
-        """Path to sample bucketed data."""
-        return Path(__file__).parent.parent / "local" / "sample_buckets.csv"
-
-    def test_bucketed_data_has_required_columns(self, sample_buckets_path):
-        """Bucketed data should have required columns for visualization."""
-        import pandas as pd
-
-        if not sample_buckets_path.exists():
+        """Path to sample bucketed data, or None if it isn't available."""
+        path = Path(__file__).parent.parent / "local" / "sample_buckets.csv"
+        return path if path.exists() else None
+
+    @pytest.fixture(scope="session")
+    def sample_buckets_df(self, sample_buckets_path):
+        """Sample bucketed data, read once and shared by every test."""
+        if sample_buckets_path is None:
             pytest.skip("Sample bucketed data not available")
 
-        df = pd.read_csv(sample_buckets_path)
+        # Flag columns keep their natural dtype so the binary checks below can fail
+        dtype = {"minute_of_day": "int32"}
+        try:
+            # Columnar Arrow parse when PyArrow is installed
+            return pd.read_csv(
+                sample_buckets_path, engine="pyarrow", dtype_backend="pyarrow", dtype=dtype
+            )
+        except ImportError:
+            return pd.read_csv(sample_buckets_path, dtype=dtype)
+
+    def test_bucketed_data_has_required_columns(self, sample_buckets_df):
+        """Bucketed data should have required columns for visualization."""
         required_columns = ["day", "minute_of_day", "asleep", "feed"]
         for col in required_columns:
-            assert col in df.columns, f"Missing required column: {col}"
+            assert col in sample_buckets_df.columns, f"Missing required column: {col}"
 
-    def test_bucketed_data_has_valid_values(self, sample_buckets_path):
+    def test_bucketed_data_has_valid_values(self, sample_buckets_df):
         """Bucketed data should have valid binary values."""
-        import pandas as pd
-
-        if not sample_buckets_path.exists():
-            pytest.skip("Sample bucketed data not available")
-
-        df = pd.read_csv(sample_buckets_path)
+        df = sample_buckets_df
 
         # asleep and feed should be 0 or 1
-        assert df["asleep"].isin([0, 1]).all(), "asleep column should be binary"
-        assert df["feed"].isin([0, 1]).all(), "feed column should be binary"
+        for col in ["asleep", "feed"]:
+            values = df[col].to_numpy()
+            assert values.dtype.kind in "iub", f"{col} column should be integer"
+            assert values.min() >= 0 and values.max() <= 1, f"{col} column should be binary"
 
         # minute_of_day should be 0-1435 in 5-minute increments
-        assert df["minute_of_day"].min() >= 0
-        assert df["minute_of_day"].max() <= 1435
-        assert (df["minute_of_day"] % 5 == 0).all(), "minute_of_day should be in 5-min increments"
+        minutes = df["minute_of_day"].to_numpy(np.int32, copy=False)
+        assert minutes.min() >= 0
+        assert minutes.max() <= 1435
+        assert not (minutes % 5).any(), "minute_of_day should be in 5-min increments"